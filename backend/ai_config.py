@@ -21,6 +21,82 @@ class AIConfig:
         # Настройки по умолчанию
         self.default_ai = os.getenv('DEFAULT_AI', 'gigachat')
         
+        # Адреса API провайдеров (GIGACHAT_URL и YANDEX_URL — например, для
+        # локального stub-сервера из benchmarks/fake_provider.py)
+        gigachat_url = os.getenv('GIGACHAT_URL', 'https://gigachat.devices.sberbank.ru').rstrip('/')
+        yandex_url = os.getenv('YANDEX_URL', 'https://llm.api.cloud.yandex.net').rstrip('/')
+        self.endpoints = {
+            'gigachat': f'{gigachat_url}/api/v1/chat/completions',
+            'yandex': f'{yandex_url}/foundationModels/v1/completion',
+            'localai': f'{self.localai_url}/v1/chat/completions'
+        }
+        
+        # Модели и температура генерации для каждого сервиса
+        self.models = {
+            'gigachat': 'GigaChat:latest',
+            'yandex': 'gpt://b1g8c7fqomqkqkqkqkqk/yandexgpt-lite',
+            'localai': 'gpt-3.5-turbo'
+        }
+        self.temperature = 0.7
+        
+        # Кэш ответов провайдеров (AI_CACHE_SQLITE — путь к файлу для кэша на диске)
+        self.cache_enabled = os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true'
+        self.cache_ttl = float(os.getenv('AI_CACHE_TTL', '3600'))
+        self.cache_max_entries = int(os.getenv('AI_CACHE_MAX_ENTRIES', '1000'))
+        self.cache_sqlite_path = os.getenv('AI_CACHE_SQLITE', '')
+        self.cache_max_disk_entries = int(os.getenv('AI_CACHE_MAX_DISK_ENTRIES', '10000'))
+        
+        # Опрос нескольких провайдеров:
+        # sequential (по умолчанию) — по очереди, hedged — следующий провайдер
+        # стартует через hedge_delay секунд (0 — все сразу), побеждает первый
+        # успешный. Hedged удваивает расход квоты на медленных ответах, поэтому
+        # включается явно, а hedge_delay стоит держать около p95 основного
+        self.race_mode = os.getenv('AI_RACE_MODE', 'sequential')
+        self.hedge_delay = float(os.getenv('AI_HEDGE_DELAY', '2.0'))
+        self.global_deadline = float(os.getenv('AI_GLOBAL_DEADLINE', '45'))
+        self.provider_timeouts = {
+            'gigachat': float(os.getenv('GIGACHAT_TIMEOUT', '30')),
+            'yandex': float(os.getenv('YANDEX_TIMEOUT', '30')),
+            'localai': float(os.getenv('LOCALAI_TIMEOUT', '30'))
+        }
+        # Потоки гонки RussianAI: каждая гонка занимает до одного потока на
+        # провайдера, проигравшие держат его до ответа, но не дольше
+        # global_deadline. Нужно не меньше одновременных генераций × провайдеров
+        self.race_workers = int(os.getenv('AI_RACE_WORKERS', '16'))
+        
+        # HTTP транспорт: размер пула keep-alive соединений на провайдера,
+        # ограниченные повторы с экспоненциальной задержкой и джиттером
+        default_pool_size = os.getenv('AI_POOL_SIZE', '20')
+        self.pool_sizes = {
+            'gigachat': int(os.getenv('GIGACHAT_POOL_SIZE', default_pool_size)),
+            'yandex': int(os.getenv('YANDEX_POOL_SIZE', default_pool_size)),
+            'localai': int(os.getenv('LOCALAI_POOL_SIZE', default_pool_size))
+        }
+        self.pool_block = os.getenv('AI_POOL_BLOCK', 'false').lower() == 'true'
+        self.http_retries = int(os.getenv('AI_HTTP_RETRIES', '2'))
+        self.http_backoff = float(os.getenv('AI_HTTP_BACKOFF', '0.3'))
+        self.http_backoff_jitter = float(os.getenv('AI_HTTP_BACKOFF_JITTER', '0.2'))
+        self.http_backoff_max = float(os.getenv('AI_HTTP_BACKOFF_MAX', '2.0'))
+        # HTTP/2 для асинхронного клиента (нужен пакет h2)
+        self.http2 = os.getenv('AI_HTTP2', 'false').lower() == 'true'
+        
+        # Circuit breaker: сколько ошибок подряд размыкает цепь и через сколько
+        # секунд пробовать провайдера снова
+        self.breaker_failure_threshold = int(os.getenv('AI_BREAKER_FAILURES', '3'))
+        self.breaker_reset_timeout = float(os.getenv('AI_BREAKER_RESET', '30'))
+        
+        # Размер контекста моделей в токенах и сколько из него оставить под ответ;
+        # код, не влезающий в контекст, обрабатывается по частям (map-reduce)
+        self.context_tokens = {
+            'gigachat': int(os.getenv('GIGACHAT_CONTEXT_TOKENS', '8192')),
+            'yandex': int(os.getenv('YANDEX_CONTEXT_TOKENS', '8000')),
+            'localai': int(os.getenv('LOCALAI_CONTEXT_TOKENS', '4096'))
+        }
+        self.response_tokens = int(os.getenv('AI_RESPONSE_TOKENS', '2000'))
+        
+        # Отвечать в чате потоком от провайдера вместо SmartAI
+        self.chat_streaming = os.getenv('AI_CHAT_STREAMING', 'false').lower() == 'true'
+        
         # Промпты для различных задач
         self.prompts = {
             'project_generation': """
@@ -74,6 +150,17 @@ class AIConfig:
             - Производительность
             - Читаемость
             - Соответствие стандартам
+            """,
+            
+            'merge_results': """
+            Код проекта был слишком большим и обработан по частям.
+            Исходная задача:
+            {task}
+            
+            Объедини результаты по частям в один связный ответ,
+            убери повторы и сохрани все изменения в коде:
+            
+            {parts}
             """
         }
     
@@ -1,73 +1,225 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, g
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import os
+import io
 import json
-import zipfile
 import tempfile
 import shutil
 from datetime import datetime
 import uuid
+import sys
 from pathlib import Path
 import subprocess
 import threading
 import queue
 import time
+from collections import deque
+from project_archive import FileDigestCache, build_zip_bytes
+from content_store import ContentStore, diff_manifests, hash_bytes, manifest_digest, render_key
+from project_parser import safe_path
+from project_catalog import ProjectCatalog
+from janitor import Janitor
+from project_paths import PathResolver
+from template_engine import TemplateRegistry
+from metrics import REGISTRY
+from session_store import SessionStore
+from intent_classifier import default_classifier
+from job_queue import JobManager, QueueFullError
+from russian_ai import RussianAI
+from async_russian_ai import AsyncRussianAI, AsyncRunner
+from socket_queue import Emitter, queue_options
+from static_assets import StaticAssets
+from singleflight import KeyedLock
+
+# Очередь сообщений, через которую события доходят до клиентов любого
+# экземпляра (redis://..., memory://)
+SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', '')
+SOCKETIO_TRANSPORTS = os.getenv('SOCKETIO_TRANSPORTS', 'polling,websocket').split(',')
 
 app = Flask(__name__)
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(
+    app, cors_allowed_origins="*", async_mode="threading",
+    transports=SOCKETIO_TRANSPORTS, **queue_options(SOCKETIO_MESSAGE_QUEUE)
+)
 
 # Конфигурация
 PROJECTS_DIR = "projects"
 TEMP_DIR = "temp"
-MAX_PROJECTS_PER_USER = 10
+# Сколько уровней шардов над папкой проекта: projects/ab/cd/<uuid> (0 — плоско)
+PROJECTS_SHARD_DEPTH = int(os.getenv('PROJECTS_SHARD_DEPTH', '2'))
+MAX_PROJECTS_PER_USER = int(os.getenv('MAX_PROJECTS_PER_USER', '10'))
+
+# Режим архивации: "memory" — ZIP собирается в памяти из сгенерированных файлов
+# и отдаётся потоком, "disk" — архив пишется в TEMP_DIR (старое поведение)
+ARCHIVE_MODE = os.getenv('ARCHIVE_MODE', 'memory')
+# Сохранять ли файлы проекта в PROJECTS_DIR
+PERSIST_PROJECTS = os.getenv('PERSIST_PROJECTS', 'true').lower() == 'true'
+# Сколько последних проектов держать в памяти для скачивания
+MAX_MEMORY_PROJECTS = int(os.getenv('MAX_MEMORY_PROJECTS', '256'))
+# Лимит памяти под общие файлы и собранные архивы
+CONTENT_STORE_MAX_BYTES = int(os.getenv('CONTENT_STORE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Сессии чата: время жизни без активности (сек), лимит сессий и длина истории
+SESSION_TTL = int(os.getenv('SESSION_TTL', '1800'))
+MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', '10000'))
+SESSION_HISTORY_SIZE = int(os.getenv('SESSION_HISTORY_SIZE', '50'))
+# Сколько символов сообщения хранить в истории
+SESSION_MESSAGE_MAX_CHARS = int(os.getenv('SESSION_MESSAGE_MAX_CHARS', '500'))
+
+# Пул воркеров генерации проектов и размер очереди
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '1000'))
+
+# Отдача архивов через прокси в дисковом режиме: x-accel (nginx,
+# X-Accel-Redirect на DOWNLOAD_ACCEL_PREFIX) или x-sendfile (Apache, lighttpd)
+DOWNLOAD_ACCEL = os.getenv('DOWNLOAD_ACCEL', '')
+DOWNLOAD_ACCEL_PREFIX = os.getenv('DOWNLOAD_ACCEL_PREFIX', '/protected-archives/')
+app.config['USE_X_SENDFILE'] = DOWNLOAD_ACCEL == 'x-sendfile'
+
+# Шаблоны проектов: project_templates/<тип>/<файлы>, компилируются при первом
+# использовании (TEMPLATE_PRELOAD=true — все сразу при старте)
+TEMPLATES_DIR = os.getenv('TEMPLATES_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'project_templates'))
+TEMPLATE_PRELOAD = os.getenv('TEMPLATE_PRELOAD', 'false').lower() == 'true'
+
+# SQLite индекс проектов для /api/projects
+PROJECT_CATALOG_PATH = os.getenv('PROJECT_CATALOG_PATH', 'project_catalog.sqlite3')
+
+# Очистка диска: проекты старше PROJECT_TTL_DAYS (0 — не удалять по возрасту),
+# архивы в TEMP_DIR старше ARCHIVE_TTL секунд; проход раз в JANITOR_INTERVAL
+JANITOR_ENABLED = os.getenv('JANITOR_ENABLED', 'true').lower() == 'true'
+JANITOR_INTERVAL = float(os.getenv('JANITOR_INTERVAL', '600'))
+JANITOR_BATCH_SIZE = int(os.getenv('JANITOR_BATCH_SIZE', '100'))
+PROJECT_TTL_DAYS = float(os.getenv('PROJECT_TTL_DAYS', '30'))
+ARCHIVE_TTL = float(os.getenv('ARCHIVE_TTL', '3600'))
+
+# Метрики Prometheus на /metrics
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Раздача фронтенда (index.html и его ассеты) из backend
+SERVE_FRONTEND = os.getenv('SERVE_FRONTEND', 'true').lower() == 'true'
+FRONTEND_DIR = os.getenv('FRONTEND_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+FRONTEND_MINIFY = os.getenv('FRONTEND_MINIFY', 'true').lower() == 'true'
 
 # Создаём директории если их нет
 os.makedirs(PROJECTS_DIR, exist_ok=True)
 os.makedirs(TEMP_DIR, exist_ok=True)
 
+# Пути к папкам проектов и архивам (генератор, скачивание, архивация, очистка)
+paths = PathResolver(PROJECTS_DIR, TEMP_DIR, depth=PROJECTS_SHARD_DEPTH)
+
 # Очередь для обработки генерации проектов
-project_queue = queue.Queue()
+project_queue = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+
+# Общее хранилище отрендеренных файлов и архивов
+content_store = ContentStore(CONTENT_STORE_MAX_BYTES, max_refs=MAX_MEMORY_PROJECTS)
+
+# Обновления одного проекта идут по очереди: иначе два воркера прочитают
+# одну базовую версию и последняя запись затрёт правку первой
+project_locks = KeyedLock()
+
+# ETag архивов на диске: hash содержимого, пересчитывается только при изменении файла
+archive_digests = FileDigestCache(max_entries=MAX_MEMORY_PROJECTS)
+
+# Каталог проектов; при первом запуске заполняется по уже существующим папкам
+project_catalog = ProjectCatalog(PROJECT_CATALOG_PATH)
+if project_catalog.count() == 0 and os.listdir(PROJECTS_DIR):
+    project_catalog.rebuild(paths)
+
+janitor = Janitor(
+    paths, project_catalog,
+    max_per_user=MAX_PROJECTS_PER_USER,
+    project_ttl=PROJECT_TTL_DAYS * 86400,
+    archive_ttl=ARCHIVE_TTL,
+    batch_size=JANITOR_BATCH_SIZE,
+    on_remove=content_store.forget_project
+)
+if JANITOR_ENABLED:
+    # При нескольких воркерах очистку ведёт один из них
+    janitor.start(JANITOR_INTERVAL, lock_path=os.path.join(TEMP_DIR, '.janitor.lock'))
+
+# Метрики горячего пути; серии с метками создаются один раз и дальше
+# обновляются без поиска по реестру
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Время обработки HTTP запроса', ('endpoint', 'method', 'status')
+)
+STAGE_LATENCY = REGISTRY.histogram('stage_duration_seconds', 'Время этапов обработки', ('stage',))
+DISK_BYTES = REGISTRY.counter('disk_bytes_written_total', 'Байт записано на диск', ('kind',))
+SOCKET_CONNECTIONS = REGISTRY.gauge('socketio_connections', 'Открытые WebSocket соединения')
+
+STAGE_CLASSIFY = STAGE_LATENCY.labels('classify')
+STAGE_RENDER = STAGE_LATENCY.labels('render')
+STAGE_WRITE_FILES = STAGE_LATENCY.labels('write_files')
+STAGE_ARCHIVE = STAGE_LATENCY.labels('archive')
+STAGE_PATCH = STAGE_LATENCY.labels('patch')
+DISK_PROJECT_FILES = DISK_BYTES.labels('project_files')
+DISK_ARCHIVES = DISK_BYTES.labels('archives')
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # Шаблон маршрута, а не путь: число серий не растёт с числом проектов
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        HTTP_LATENCY.labels(endpoint, request.method, response.status_code).observe(
+            time.perf_counter() - started
+        )
+    return response
 
 class ProjectGenerator:
     def __init__(self):
-        self.templates = {
-            "html": {
-                "files": {
-                    "index.html": self.get_html_index,
-                    "styles.css": self.get_html_styles,
-                    "script.js": self.get_html_script,
-                    "README.md": self.get_html_readme
-                }
-            }
-        }
+        self.templates = TemplateRegistry(TEMPLATES_DIR, default="html")
+        if TEMPLATE_PRELOAD:
+            self.templates.preload()
     
-    def generate_project(self, project_type, description, project_name):
+    def render_project(self, project_type, description, project_name, only_paths=None):
+        """Рендерит файлы проекта в память без записи на диск.
+        
+        only_paths ограничивает рендер указанными файлами шаблона.
+        """
+        context = {"project_name": project_name, "description": description}
+        with STAGE_RENDER.time():
+            return self.templates.render(project_type, context, only_paths)
+    
+    def generate_project(self, project_type, description, project_name, persist=None, owner=None):
         """Генерирует проект на основе описания"""
+        if persist is None:
+            # Дисковому режиму архивации нужны файлы в PROJECTS_DIR
+            persist = PERSIST_PROJECTS or ARCHIVE_MODE == 'disk'
         try:
             # Создаём уникальный ID проекта
             project_id = str(uuid.uuid4())
-            project_path = os.path.join(PROJECTS_DIR, project_id)
-            os.makedirs(project_path, exist_ok=True)
             
-            # Получаем шаблон для типа проекта
-            template = self.templates.get(project_type, self.templates["html"])
+            # Генерируем файлы проекта (или берём уже отрендеренные)
+            digest, files = self.get_rendered_files(project_type, description, project_name)
             
-            # Генерируем файлы проекта
-            for file_path, generator_func in template["files"].items():
-                full_path = os.path.join(project_path, file_path)
-                os.makedirs(os.path.dirname(full_path), exist_ok=True)
-                
-                content = generator_func(project_name, description)
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            if persist:
+                with STAGE_WRITE_FILES.time():
+                    project_path = paths.project_dir(project_id)
+                    os.makedirs(project_path, exist_ok=True)
+                    for file_path, content in files.items():
+                        full_path = os.path.join(project_path, file_path)
+                        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                        with open(full_path, 'wb') as f:
+                            f.write(content)
+                DISK_PROJECT_FILES.inc(sum(len(content) for content in files.values()))
+            
+            content_store.bind_project(project_id, digest)
+            project_catalog.add(
+                project_id, project_name, project_type, owner,
+                file_count=len(files), size_bytes=sum(len(content) for content in files.values())
+            )
             
             return {
                 "success": True,
                 "project_id": project_id,
                 "project_name": project_name,
-                "files": list(template["files"].keys())
+                "files": list(files.keys())
             }
         except Exception as e:
             return {
@@ -75,99 +227,206 @@ class ProjectGenerator:
                 "error": str(e)
             }
     
-    def get_html_index(self, project_name, description):
-        return f"""<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{project_name}</title>
-    <link rel="stylesheet" href="styles.css">
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>{project_name}</h1>
-            <p>{description}</p>
-        </header>
-        <main>
-            <p>Создано с помощью Lovable AI</p>
-        </main>
-    </div>
-    <script src="script.js"></script>
-</body>
-</html>"""
-    
-    def get_html_styles(self, project_name, description):
-        return """body {
-    font-family: Arial, sans-serif;
-    margin: 0;
-    padding: 0;
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    min-height: 100vh;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-}
-
-.container {
-    text-align: center;
-    color: white;
-    padding: 2rem;
-    background: rgba(255, 255, 255, 0.1);
-    border-radius: 20px;
-    backdrop-filter: blur(10px);
-}
-
-h1 {
-    font-size: 2.5rem;
-    margin-bottom: 1rem;
-}
-
-p {
-    font-size: 1.2rem;
-    margin-bottom: 1rem;
-}"""
-
-    def get_html_script(self, project_name, description):
-        return """console.log('Приложение загружено!');
-
-// Добавляем интерактивность
-document.addEventListener('DOMContentLoaded', function() {
-    const container = document.querySelector('.container');
+    def update_project(self, project_id, project_type=None, description=None, project_name=None,
+                       only_paths=None, files=None, remove=None, persist=None):
+        """Обновляет существующий проект, записывая только изменённые файлы.
+        
+        Файлы шаблона перерендериваются, если передано описание (only_paths
+        ограничивает их список); тип и название по умолчанию берутся из
+        каталога проектов. files — правки содержимого {путь: текст},
+        remove — удаляемые пути. Изменения определяются по хэшам содержимого,
+        архив проекта собирается из предыдущего с пережатием только
+        изменённых файлов.
+        """
+        if persist is None:
+            persist = PERSIST_PROJECTS or ARCHIVE_MODE == 'disk'
+        with project_locks.hold(project_id):
+            try:
+                record = project_catalog.get(project_id)
+                if record is not None:
+                    if project_type and project_type != record["project_type"]:
+                        return {
+                            "success": False,
+                            "error": f"Тип проекта {record['project_type']} нельзя сменить на {project_type}"
+                        }
+                    project_type = record["project_type"]
+                    project_name = project_name or record["name"]
+                project_type = project_type or "html"
+            
+                base_digest = content_store.project_digest(project_id)
+                if base_digest is None:
+                    current = self.read_project_files(project_id)
+                    if current is None:
+                        return {"success": False, "error": "Проект не найден"}
+                    base_digest = content_store.put_files(current)
+                    content_store.bind_project(project_id, base_digest)
+                base_manifest = content_store.get_manifest(base_digest)
+                current = content_store.get_files(base_digest)
+                if base_manifest is None or current is None:
+                    return {"success": False, "error": "Проект не найден"}
+            
+                updates = {}
+                if description is not None:
+                    updates.update(self.render_project(
+                        project_type, description, project_name or f"Проект {project_type}", only_paths
+                    ))
+                for file_path, content in (files or {}).items():
+                    clean_path = safe_path(file_path)
+                    if clean_path is None:
+                        return {"success": False, "error": f"Недопустимый путь: {file_path}"}
+                    updates[clean_path] = content
+            
+                changed = {}
+                for file_path, content in updates.items():
+                    data = content.encode('utf-8') if isinstance(content, str) else content
+                    if base_manifest.get(file_path) != hash_bytes(data):
+                        changed[file_path] = data
+                removed = [
+                    file_path for file_path in (remove or ())
+                    if file_path in current and file_path not in changed
+                ]
+            
+                new_files = {path: data for path, data in current.items() if path not in removed}
+                new_files.update(changed)
+                digest = content_store.put_files(new_files)
+                diff = diff_manifests(base_manifest, content_store.get_manifest(digest))
+            
+                if changed or removed:
+                    with STAGE_PATCH.time():
+                        content_store.patch_archive(base_digest, digest, changed, removed)
+                    content_store.bind_project(project_id, digest)
+                    project_catalog.touch(
+                        project_id, len(new_files), sum(len(data) for data in new_files.values())
+                    )
+                    if persist:
+                        self.write_project_changes(project_id, changed, removed)
+            
+                return {
+                    "success": True,
+                    "project_id": project_id,
+                    "files": list(new_files.keys()),
+                    "diff": diff,
+                    "changed_files": {
+                        file_path: data.decode('utf-8', errors='replace')
+                        for file_path, data in changed.items()
+                    }
+                }
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": str(e)
+                }
     
-    container.addEventListener('click', function() {
-        this.style.transform = 'scale(1.05)';
-        setTimeout(() => {
-            this.style.transform = 'scale(1)';
-        }, 200);
-    });
-});"""
-
-    def get_html_readme(self, project_name, description):
-        return f"""# {project_name}
-
-{description}
-
-## Создано с помощью Lovable AI
-
-### Запуск
-
-Просто откройте index.html в браузере или используйте локальный сервер:
-
-```bash
-python -m http.server 8000
-```
-
-Затем откройте http://localhost:8000"""
+    def write_project_changes(self, project_id, changed, removed):
+        """Записывает на диск только изменённые файлы проекта"""
+        project_path = paths.find_project_dir(project_id) or paths.project_dir(project_id)
+        with STAGE_WRITE_FILES.time():
+            for file_path, data in changed.items():
+                full_path = os.path.join(project_path, file_path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'wb') as f:
+                    f.write(data)
+        DISK_PROJECT_FILES.inc(sum(len(data) for data in changed.values()))
+        for file_path in removed:
+            full_path = os.path.join(project_path, file_path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+        
+        if ARCHIVE_MODE == 'disk':
+            # Архив на диске устарел; берём пропатченный из хранилища
+            archive_path = paths.find_archive(project_id) or paths.archive_path(project_id)
+            digest = content_store.project_digest(project_id)
+            archive = content_store.get_archive(digest) if digest else None
+            if archive is not None:
+                os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+                with open(archive_path, 'wb') as f:
+                    f.write(archive)
+                DISK_ARCHIVES.inc(len(archive))
+            elif os.path.exists(archive_path):
+                os.remove(archive_path)
+    
+    def get_rendered_files(self, project_type, description, project_name):
+        """Возвращает digest и файлы проекта, рендеря их только при промахе кэша"""
+        key = render_key(project_type, project_name, description)
+        digest = content_store.lookup_render(key)
+        if digest is not None:
+            files = content_store.get_files(digest)
+            if files is not None:
+                return digest, files
+        
+        rendered = self.render_project(project_type, description, project_name)
+        digest = content_store.put_files(rendered)
+        content_store.remember_render(key, digest)
+        return digest, {path: content.encode('utf-8') for path, content in rendered.items()}
+    
+    def get_project_archive(self, project_id):
+        """Возвращает (ZIP, ETag) проекта из хранилища, подгружая файлы с диска при промахе"""
+        digest = content_store.project_digest(project_id)
+        if digest is None:
+            files = self.read_project_files(project_id)
+            if files is None:
+                return None
+            digest = content_store.put_files(files)
+            content_store.bind_project(project_id, digest)
+        with STAGE_ARCHIVE.time():
+            archive = content_store.get_archive(digest)
+        if archive is None:
+            # Манифест успели вытеснить — собираем архив с диска напрямую
+            files = self.read_project_files(project_id)
+            if files is None:
+                return None
+            archive = build_zip_bytes(files)
+            digest = manifest_digest({path: hash_bytes(data) for path, data in files.items()})
+        # Сборка детерминирована, поэтому ETag — digest манифеста
+        return archive, digest
+    
+    def read_project_files(self, project_id):
+        """Читает файлы проекта из PROJECTS_DIR"""
+        # Не даём выйти за пределы PROJECTS_DIR через project_id
+        try:
+            uuid.UUID(project_id)
+        except ValueError:
+            return None
+        
+        project_path = paths.find_project_dir(project_id)
+        if project_path is None:
+            return None
+        
+        files = {}
+        for root, dirs, filenames in os.walk(project_path):
+            for filename in filenames:
+                file_path = os.path.join(root, filename)
+                arcname = os.path.relpath(file_path, project_path).replace(os.sep, '/')
+                with open(file_path, 'rb') as f:
+                    files[arcname] = f.read()
+        return files
 
 # Инициализируем генератор проектов
 generator = ProjectGenerator()
 
-# Умный AI-агент с памятью, контекстом и простым обучением
+# Фронтенд минифицируется и сжимается один раз при старте
+frontend = None
+if SERVE_FRONTEND:
+    try:
+        frontend = StaticAssets(FRONTEND_DIR, minify=FRONTEND_MINIFY)
+    except OSError as e:
+        print(f"⚠️ Фронтенд не найден, раздача статики отключена: {e}")
+
+# Умный AI-агент с памятью, контекстом и простым обучением.
+# Один экземпляр на сессию, поэтому состояние компактное (__slots__).
 class SmartAI:
-    def __init__(self):
-        self.conversation_history = []
+    __slots__ = (
+        "conversation_history", "topic_counts", "compacted_turns", "user_preferences",
+        "current_context", "last_topic", "user_mood", "interaction_count",
+        "learning_data", "last_seen", "lock"
+    )
+    
+    def __init__(self, history_size=SESSION_HISTORY_SIZE):
+        # Кольцевой буфер последних сообщений
+        self.conversation_history = deque(maxlen=history_size)
+        # Сообщения, выпавшие из окна, сворачиваются в счётчики по типу
+        self.topic_counts = {}
+        self.compacted_turns = 0
         self.user_preferences = {}
         self.current_context = None
         self.last_topic = None
@@ -182,83 +441,87 @@ class SmartAI:
             "preferred_topics": [],
             "response_style": "normal"
         }
+        self.last_seen = 0.0
+        # Сериализует только запросы одной и той же сессии
+        self.lock = threading.Lock()
         
-    def generate_response(self, message):
+    def generate_response(self, message, socket_id=None, owner=None):
         """Генерирует умный ответ с учетом контекста, настроения и обучения"""
-        message_type = self.analyze_message(message)
-        self.conversation_history.append({"user": message, "type": message_type})
+        with self.lock:
+            return self._generate_response(message, socket_id, owner)
+    
+    def _generate_response(self, message, socket_id=None, owner=None):
+        # Один проход по сообщению даёт и намерение, и темы, и тип проекта
+        with STAGE_CLASSIFY.time():
+            classification = default_classifier.classify(message)
+        message_type = self.analyze_message(message, classification)
+        self.remember_turn(message, message_type)
         self.current_context = message_type
         self.last_topic = message_type
         
         # Учимся на основе сообщения пользователя
-        self.learn_from_interaction(message, message_type)
+        self.learn_from_interaction(message, message_type, classification)
         
-        return self.generate_normal_response(message, message_type)
+        return self.generate_normal_response(message, message_type, classification, socket_id, owner)
+    
+    def remember_turn(self, message, message_type):
+        """Добавляет сообщение в окно истории, сворачивая самое старое в счётчики"""
+        history = self.conversation_history
+        if history.maxlen is not None and len(history) == history.maxlen:
+            oldest_type = history[0]["type"]
+            self.topic_counts[oldest_type] = self.topic_counts.get(oldest_type, 0) + 1
+            self.compacted_turns += 1
+        history.append({"user": message[:SESSION_MESSAGE_MAX_CHARS], "type": message_type})
     
-    def analyze_message(self, message):
+    def memory_footprint(self):
+        """Приблизительный объём памяти состояния сессии в байтах"""
+        size = sys.getsizeof(self) + sys.getsizeof(self.conversation_history)
+        for turn in self.conversation_history:
+            size += sys.getsizeof(turn) + sys.getsizeof(turn["user"])
+        size += sys.getsizeof(self.topic_counts) + sys.getsizeof(self.user_preferences)
+        size += sys.getsizeof(self.learning_data)
+        for value in self.learning_data.values():
+            size += sys.getsizeof(value)
+        return size
+    
+    def analyze_message(self, message, classification=None):
         """Анализирует сообщение пользователя с учетом контекста"""
-        message_lower = message.lower()
+        if classification is None:
+            classification = default_classifier.classify(message)
         self.interaction_count += 1
-        
-        # Приветствия
-        if any(word in message_lower for word in ["привет", "здравствуй", "добрый", "hi", "hello"]):
-            return "greeting"
-        
-        # Вопросы о самочувствии
-        if any(word in message_lower for word in ["как дела", "как ты", "как поживаешь"]):
-            return "wellbeing"
-        
-        # Запросы на создание проекта
-        if any(word in message_lower for word in ["создай", "сделай", "построй", "разработай", "напиши"]):
-            return "create_project"
-        
-        # Вопросы о возможностях
-        if any(word in message_lower for word in ["что умеешь", "возможности", "функции", "помощь"]):
-            return "capabilities"
-        
-        # Игры и развлечения
-        if any(word in message_lower for word in ["игра", "game", "игр", "развлечение", "весело"]):
-            return "game_discussion"
-        
-        # Вопросы о том, что можно создать
-        if any(word in message_lower for word in ["что можно", "что думаешь", "как думаешь", "предложи", "идеи"]):
-            return "suggestions"
-        
-        return "general"
+        return classification.intent
     
-    def learn_from_interaction(self, message, response_type):
+    def learn_from_interaction(self, message, response_type, classification=None):
         """Учится на основе взаимодействия с пользователем"""
-        message_lower = message.lower()
+        if classification is None:
+            classification = default_classifier.classify(message)
         
         # Анализируем паттерны пользователя
-        if "игра" in message_lower or "game" in message_lower:
-            if "игра" not in self.learning_data["preferred_topics"]:
-                self.learning_data["preferred_topics"].append("игра")
-        
-        if "будильник" in message_lower or "таймер" in message_lower:
-            if "таймер" not in self.learning_data["preferred_topics"]:
-                self.learning_data["preferred_topics"].append("таймер")
-    
-    def create_project_response(self, project_type, description):
-        """Создает проект и возвращает ответ с ссылкой на скачивание"""
-        # Используем глобальный генератор проектов
-        global generator
-        
+        for topic in classification.topics:
+            if topic not in self.learning_data["preferred_topics"]:
+                self.learning_data["preferred_topics"].append(topic)
+    
+    def create_project_response(self, project_type, description, socket_id=None, owner=None):
+        """Ставит проект в очередь и возвращает ответ с ID задачи"""
         project_name = f"Проект {project_type}"
-        result = generator.generate_project("html", description, project_name)
+        try:
+            job = job_manager.submit({
+                "project_type": PROJECT_TEMPLATES.get(project_type, "html"),
+                "description": description,
+                "project_name": project_name,
+                "owner": owner
+            }, sid=socket_id)
+        except QueueFullError as e:
+            job = None
+            error = str(e)
         
-        if result['success']:
-            # Создаём архив проекта
-            archive_path = create_project_archive(result['project_id'])
-            download_url = f"http://localhost:5002/api/download/{result['project_id']}"
-            
+        if job is not None:
             return {
-                "type": "project_created",
-                "message": f"✅ {description} готов!\n\n🎉 Ваш проект успешно создан!\n📦 Проект ID: {result['project_id']}\n⬇️ Вы можете скачать его по кнопке ниже.",
-                "project_id": result['project_id'],
-                "download_url": download_url,
+                "type": "project_queued",
+                "message": f"⏳ {description}...\n\n📦 Задача: {job['job_id']}\n⬇️ Кнопка скачивания появится, как только проект будет готов.",
+                "job_id": job['job_id'],
+                "status_url": f"/api/jobs/{job['job_id']}",
                 "suggestions": [
-                    "Скачать проект",
                     "Создать другой проект",
                     "Показать код",
                     "Что еще можешь?"
@@ -267,7 +530,7 @@ class SmartAI:
         else:
             return {
                 "type": "error",
-                "message": f"❌ Произошла ошибка при создании проекта: {result.get('error', 'Неизвестная ошибка')}",
+                "message": f"❌ Произошла ошибка при создании проекта: {error}",
                 "suggestions": [
                     "Попробовать еще раз",
                     "Создать другой проект",
@@ -275,7 +538,7 @@ class SmartAI:
                 ]
             }
     
-    def generate_normal_response(self, message, message_type):
+    def generate_normal_response(self, message, message_type, classification=None, socket_id=None, owner=None):
         """Генерирует обычный ответ"""
         if message_type == "greeting":
             return {
@@ -327,16 +590,18 @@ class SmartAI:
         
         elif message_type == "create_project":
             # Определяем, что именно хочет создать пользователь
-            message_lower = message.lower()
+            if classification is None:
+                classification = default_classifier.classify(message)
+            project_kind = classification.project_kind
             
-            if "калькулятор" in message_lower:
-                return self.create_project_response("calculator", "Создаю красивый калькулятор с современным дизайном")
-            elif "будильник" in message_lower:
-                return self.create_project_response("alarm", "Создаю стильный будильник с звуковыми сигналами")
-            elif "игр" in message_lower:
-                return self.create_project_response("game", "Создаю увлекательную игру с интересной механикой")
-            elif "сайт" in message_lower and "университет" in message_lower:
-                return self.create_project_response("university", "Создаю современный сайт для университета")
+            if project_kind == "calculator":
+                return self.create_project_response("calculator", "Создаю красивый калькулятор с современным дизайном", socket_id, owner)
+            elif project_kind == "alarm":
+                return self.create_project_response("alarm", "Создаю стильный будильник с звуковыми сигналами", socket_id, owner)
+            elif project_kind == "game":
+                return self.create_project_response("game", "Создаю увлекательную игру с интересной механикой", socket_id, owner)
+            elif project_kind == "university":
+                return self.create_project_response("university", "Создаю современный сайт для университета", socket_id, owner)
             else:
                 return {
                     "type": "ai_response", 
@@ -373,7 +638,18 @@ class SmartAI:
                 ]
             }
 
-ai_agent = SmartAI()
+# Шаблон для проектов, которые агент предлагает в чате
+PROJECT_TEMPLATES = {
+    "game": "game",
+    "university": "landing"
+}
+
+# Состояние агента хранится отдельно для каждой сессии
+agent_sessions = SessionStore(SmartAI, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS)
+
+def request_owner(data=None):
+    """Владелец проекта: user_id из тела запроса или заголовок X-User-Id"""
+    return (data or {}).get('user_id') or request.headers.get('X-User-Id')
 
 # API endpoints
 @app.route('/api/chat', methods=['POST'])
@@ -381,8 +657,12 @@ def chat():
     """Обработка сообщений чата"""
     data = request.json
     message = data.get('message', '')
+    session_id = data.get('session_id') or request.headers.get('X-Session-Id')
     
-    ai_response = ai_agent.generate_response(message)
+    session_id, ai_agent = agent_sessions.get(session_id)
+    # socket_id позволяет прислать статус созданного проекта через WebSocket
+    ai_response = ai_agent.generate_response(message, data.get('socket_id'), request_owner(data))
+    ai_response['session_id'] = session_id
     
     return jsonify(ai_response)
 
@@ -394,50 +674,161 @@ def generate_project():
     project_name = data.get('project_name', 'Мой проект')
     project_type = data.get('project_type', 'html')
     
-    # Генерируем проект
-    result = generator.generate_project(project_type, description, project_name)
+    # Генерация идёт в пуле воркеров, клиент получает ID задачи сразу
+    try:
+        job = job_manager.submit({
+            "project_type": project_type,
+            "description": description,
+            "project_name": project_name,
+            "owner": request_owner(data)
+        }, sid=data.get('socket_id'))
+    except QueueFullError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     
-    if result['success']:
-        # Создаём архив проекта
-        archive_path = create_project_archive(result['project_id'])
-        result['download_url'] = f"/api/download/{result['project_id']}"
-        result['archive_path'] = archive_path
+    return jsonify({
+        "success": True,
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "status_url": f"/api/jobs/{job['job_id']}"
+    }), 202
+
+@app.route('/api/projects/<project_id>/update', methods=['POST'])
+def update_project(project_id):
+    """Обновление существующего проекта: перезаписываются только изменённые файлы"""
+    data = request.json or {}
+    try:
+        job = job_manager.submit(update_payload(project_id, data), sid=data.get('socket_id'))
+    except QueueFullError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     
-    return jsonify(result)
+    return jsonify({
+        "success": True,
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "status_url": f"/api/jobs/{job['job_id']}"
+    }), 202
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Статус задачи генерации проекта"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Задача не найдена"}), 404
+    return jsonify(job)
 
 @app.route('/api/download/<project_id>')
 def download_project(project_id):
-    """Скачивание проекта"""
-    project_path = os.path.join(PROJECTS_DIR, project_id)
-    archive_path = os.path.join(TEMP_DIR, f"{project_id}.zip")
+    """Скачивание проекта: ETag по содержимому архива, 304 и докачка по Range"""
+    download_name = f"project_{project_id}.zip"
+    if ARCHIVE_MODE == 'disk':
+        try:
+            uuid.UUID(project_id)
+        except ValueError:
+            return jsonify({"error": "Проект не найден"}), 404
+        
+        # Обычно архив уже собран: папку проекта проверяем только при его отсутствии
+        archive_path = paths.find_archive(project_id)
+        if archive_path is None:
+            if paths.find_project_dir(project_id) is None:
+                return jsonify({"error": "Проект не найден"}), 404
+            archive_path = create_project_archive(project_id)
+            if archive_path is None:
+                return jsonify({"error": "Проект не найден"}), 404
+        
+        entry = archive_digests.get(archive_path)
+        if entry is None:
+            # Очистка удалила просроченный архив после find_archive — проект
+            # может быть жив, собираем архив заново
+            archive_path = create_project_archive(project_id)
+            entry = archive_digests.get(archive_path) if archive_path else None
+            if entry is None:
+                return jsonify({"error": "Проект не найден"}), 404
+        etag, stat = entry
+        
+        if DOWNLOAD_ACCEL == 'x-accel':
+            return accel_redirect(archive_path, etag, stat.st_mtime, download_name)
+        response = send_file(
+            os.path.abspath(archive_path), mimetype='application/zip', as_attachment=True,
+            download_name=download_name, etag=etag, last_modified=stat.st_mtime, max_age=0
+        )
+        response.headers.setdefault('Accept-Ranges', 'bytes')
+        return response
     
-    if not os.path.exists(project_path):
+    archive = generator.get_project_archive(project_id)
+    if archive is None:
         return jsonify({"error": "Проект не найден"}), 404
+    archive, etag = archive
     
-    # Создаём архив если его нет
-    if not os.path.exists(archive_path):
-        create_project_archive(project_id)
+    # Архив общий для всех проектов с одинаковым содержимым; send_file
+    # отвечает 304 по If-None-Match и отдаёт части по Range
+    record = project_catalog.get(project_id)
+    response = send_file(
+        io.BytesIO(archive), mimetype='application/zip', as_attachment=True,
+        download_name=download_name, etag=etag,
+        last_modified=record["updated_at"] if record else None, max_age=0
+    )
+    response.headers.setdefault('Accept-Ranges', 'bytes')
+    return response
+
+def accel_redirect(archive_path, etag, mtime, download_name):
+    """Передаёт отдачу архива nginx через X-Accel-Redirect.
     
-    return send_file(archive_path, as_attachment=True, download_name=f"project_{project_id}.zip")
+    Условные запросы проверяются здесь, Range и саму передачу файла
+    обслуживает nginx из internal location над TEMP_DIR.
+    """
+    relative = os.path.relpath(archive_path, TEMP_DIR).replace(os.sep, '/')
+    response = Response(mimetype='application/zip')
+    response.headers['X-Accel-Redirect'] = DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/' + relative
+    response.headers['Content-Disposition'] = f"attachment; filename={download_name}"
+    response.cache_control.no_cache = True
+    response.set_etag(etag)
+    response.last_modified = mtime
+    return response.make_conditional(request)
 
 @app.route('/api/projects')
 def list_projects():
-    """Список проектов"""
-    projects = []
-    for project_id in os.listdir(PROJECTS_DIR):
-        project_path = os.path.join(PROJECTS_DIR, project_id)
-        if os.path.isdir(project_path):
-            projects.append({
-                "id": project_id,
-                "name": f"Проект {project_id[:8]}",
-                "created_at": datetime.fromtimestamp(os.path.getctime(project_path)).isoformat()
-            })
-    
-    return jsonify({"projects": projects})
+    """Список проектов из каталога, постранично.
+    
+    Параметры: limit, cursor (из next_cursor предыдущей страницы),
+    sort (created_at, updated_at, name), order (asc, desc), user_id.
+    """
+    try:
+        rows, next_cursor = project_catalog.list(
+            owner=request.args.get('user_id') or request.headers.get('X-User-Id'),
+            sort=request.args.get('sort', 'created_at'),
+            order=request.args.get('order', 'desc'),
+            limit=request.args.get('limit', 50, type=int),
+            cursor=request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    projects = [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "owner": row["owner"],
+            "project_type": row["project_type"],
+            "files": row["file_count"],
+            "size_bytes": row["size_bytes"],
+            "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "updated_at": datetime.fromtimestamp(row["updated_at"]).isoformat()
+        }
+        for row in rows
+    ]
+    return jsonify({"projects": projects, "next_cursor": next_cursor})
 
 @app.route('/api/ai/status')
 def get_ai_status():
     """Получить статус AI сервисов"""
+    config = provider_ai.config
+    health = provider_ai.health.snapshot()
+    providers = [
+        ("gigachat", "GigaChat", config.gigachat_enabled),
+        ("yandex", "Yandex GPT", config.yandex_enabled),
+        ("localai", "LocalAI", config.localai_enabled)
+    ]
+    
     return jsonify({
         "available_services": [
             {
@@ -445,67 +836,265 @@ def get_ai_status():
                 "enabled": True,
                 "configured": True
             }
+        ] + [
+            {
+                "id": service,
+                "name": name,
+                "enabled": enabled,
+                "configured": enabled,
+                "health": health[service]
+            }
+            for service, name, enabled in providers
         ],
+        # Порядок, в котором провайдеры будут опрошены сейчас
+        "provider_order": provider_ai.available_services(),
         "current_ai": "smartai",
-        "configured": True
+        "configured": True,
+        # Потоковые ответы доступны через событие ai_stream
+        "streaming_available": provider_ai.config.chat_streaming and (
+            provider_ai.config.gigachat_enabled or provider_ai.config.localai_enabled
+        ),
+        "response_cache": provider_ai.cache.stats() if provider_ai.cache else None,
+        "transport": provider_ai.transport_stats(),
+        "async_in_flight": async_runner.in_flight(),
+        # Сколько одинаковых одновременных запросов обслужено одним вызовом
+        "coalescing": {
+            "sync": provider_ai.flights.stats(),
+            "async": async_ai.flights.stats()
+        }
     })
 
+@app.route('/api/ai/stats')
+def get_ai_stats():
+    """Статистика памяти агента и хранилища проектов"""
+    sessions = agent_sessions.snapshot()
+    history_turns = sum(len(agent.conversation_history) for agent in sessions)
+    compacted_turns = sum(agent.compacted_turns for agent in sessions)
+    memory_bytes = sum(agent.memory_footprint() for agent in sessions)
+    
+    return jsonify({
+        "sessions": {
+            "active": len(sessions),
+            "evicted": agent_sessions.evicted,
+            "ttl": SESSION_TTL,
+            "max_sessions": MAX_SESSIONS
+        },
+        "memory": {
+            "history_window": SESSION_HISTORY_SIZE,
+            "message_max_chars": SESSION_MESSAGE_MAX_CHARS,
+            "history_turns": history_turns,
+            "compacted_turns": compacted_turns,
+            "bytes": memory_bytes
+        },
+        "content_store": content_store.stats(),
+        "janitor": janitor.stats()
+    })
+
+@app.route('/')
+@app.route('/<filename>')
+def serve_frontend(filename='index.html'):
+    """index.html и ассеты с отпечатками; сжатие и 304 по ETag"""
+    asset = frontend.get(filename) if frontend is not None else None
+    if asset is None:
+        return jsonify({"error": "Файл не найден"}), 404
+    status, body, headers = asset.respond(
+        request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match')
+    )
+    return Response(body, status=status, headers=headers)
+
+@app.route('/metrics')
+def get_metrics():
+    """Метрики в текстовом формате Prometheus"""
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Метрики отключены"}), 404
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+def update_payload(project_id, data):
+    """Задача обновления проекта из тела запроса или события WebSocket"""
+    return {
+        "project_id": project_id,
+        "project_type": data.get('project_type'),
+        "description": data.get('description'),
+        "project_name": data.get('project_name'),
+        "paths": data.get('paths'),
+        "files": data.get('files'),
+        "remove": data.get('remove')
+    }
+
+def run_project_job(payload, progress):
+    """Выполняет задачу генерации или обновления проекта в воркере"""
+    if payload.get("project_id"):
+        result = generator.update_project(
+            payload["project_id"], payload["project_type"], payload["description"],
+            payload["project_name"], payload["paths"], payload["files"], payload["remove"]
+        )
+        if result['success']:
+            diff = result['diff']
+            result['message'] = (
+                f"Проект обновлён: изменено {len(diff['added']) + len(diff['modified'])}, "
+                f"удалено {len(diff['removed'])} файлов"
+            )
+    else:
+        result = generator.generate_project(
+            payload["project_type"], payload["description"], payload["project_name"],
+            owner=payload.get("owner")
+        )
+    
+    if result['success']:
+        # Создаём архив нового проекта; при обновлении пропатченный архив
+        # уже записан в write_project_changes
+        if ARCHIVE_MODE == 'disk' and not payload.get("project_id"):
+            progress(70, 'Упаковываю проект...')
+            create_project_archive(result['project_id'])
+        result['download_url'] = f"/api/download/{result['project_id']}"
+    
+    return result
+
+def notify_job_status(job):
+    """Отправляет статус задачи клиенту, который её создал"""
+    if not job.get('sid'):
+        return
+    status = {
+        'status': job['status'],
+        'job_id': job['job_id'],
+        'progress': job['progress'],
+        'message': job['message']
+    }
+    result = job.get('result') or {}
+    if job['status'] == 'completed':
+        status['project_id'] = result['project_id']
+        status['download_url'] = result['download_url']
+        if 'diff' in result:
+            # Клиенту уходят только изменения, а не весь проект
+            socketio.emit('project_diff', {
+                'job_id': job['job_id'],
+                'project_id': result['project_id'],
+                'added': result['diff']['added'],
+                'modified': result['diff']['modified'],
+                'removed': result['diff']['removed'],
+                'files': result['changed_files']
+            }, to=job['sid'])
+    socketio.emit('project_status', status, to=job['sid'])
+
+job_manager = JobManager(
+    project_queue, run_project_job, workers=JOB_WORKERS, notify=notify_job_status
+)
+
+# Клиент внешних AI провайдеров (GigaChat, Yandex GPT, LocalAI)
+provider_ai = RussianAI()
+
+# Асинхронный клиент для обработчиков WebSocket: ожидание ответа LLM
+# не занимает поток, все генерации живут в одном event loop
+async_ai = AsyncRussianAI(provider_ai.config)
+async_ai.share_state(provider_ai)
+async_runner = AsyncRunner()
+# События из event loop уходят через отдельный поток, loop не ждёт брокер
+loop_emitter = Emitter(socketio)
+
+# Значения, которые и так хранятся в объектах, читаются в момент выгрузки
+REGISTRY.callback_gauge('job_queue_depth', 'Задачи в очереди генерации', project_queue.qsize)
+REGISTRY.callback_gauge('content_store_bytes', 'Объём хранилища отрендеренных файлов',
+                        lambda: content_store.stats()["bytes"])
+REGISTRY.callback_gauge('agent_sessions', 'Активные сессии агента', lambda: len(agent_sessions))
+REGISTRY.callback_gauge('async_in_flight', 'Генерации в event loop', async_runner.in_flight)
+REGISTRY.callback_gauge('socketio_emit_queue', 'События в очереди отправки', loop_emitter.pending)
+
 def create_project_archive(project_id):
-    """Создаёт архив проекта"""
-    project_path = os.path.join(PROJECTS_DIR, project_id)
-    archive_path = os.path.join(TEMP_DIR, f"{project_id}.zip")
+    """Создаёт архив проекта.
+    
+    Архив собирается так же, как в хранилище: одинаковые файлы дают
+    одинаковые байты и ETag после пересборки.
+    """
+    files = generator.read_project_files(project_id)
+    if files is None:
+        return None
+    archive_path = paths.archive_path(project_id)
+    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
     
-    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, project_path)
-                zipf.write(file_path, arcname)
+    with STAGE_ARCHIVE.time():
+        archive = build_zip_bytes(files)
+        # Через временный файл: параллельное скачивание не увидит недописанный архив
+        tmp_path = f"{archive_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(archive)
+        os.replace(tmp_path, archive_path)
+    DISK_ARCHIVES.inc(len(archive))
     
     return archive_path
 
 # WebSocket для real-time обновлений
 @socketio.on('connect')
 def handle_connect():
+    SOCKET_CONNECTIONS.inc()
     print('Клиент подключился')
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    SOCKET_CONNECTIONS.dec()
     print('Клиент отключился')
 
 @socketio.on('generate_project')
 def handle_project_generation(data):
     """Обработка генерации проекта через WebSocket"""
-    project_id = data.get('project_id')
     description = data.get('description')
     project_name = data.get('project_name', 'Мой проект')
     project_type = data.get('project_type', 'html')
     
-    # Отправляем статус начала генерации
-    emit('project_status', {
-        'status': 'generating',
-        'message': 'Создаю проект...'
-    })
-    
-    # Генерируем проект
-    result = generator.generate_project(project_type, description, project_name)
-    
-    if result['success']:
-        # Создаём архив
-        archive_path = create_project_archive(result['project_id'])
-        
+    # Ставим задачу в очередь, статусы придут событием project_status
+    try:
+        job_manager.submit({
+            "project_type": project_type,
+            "description": description,
+            "project_name": project_name,
+            "owner": data.get('user_id')
+        }, sid=request.sid)
+    except QueueFullError as e:
         emit('project_status', {
-            'status': 'completed',
-            'project_id': result['project_id'],
-            'download_url': f"/api/download/{result['project_id']}",
-            'message': 'Проект создан успешно!'
+            'status': 'error',
+            'message': f'Ошибка: {e}'
         })
-    else:
+
+@socketio.on('update_project')
+def handle_project_update(data):
+    """Обновление проекта через WebSocket; изменения придут событием project_diff"""
+    project_id = data.get('project_id')
+    if not project_id:
+        emit('project_status', {'status': 'error', 'message': 'Ошибка: не указан project_id'})
+        return
+    
+    try:
+        job_manager.submit(update_payload(project_id, data), sid=request.sid)
+    except QueueFullError as e:
         emit('project_status', {
             'status': 'error',
-            'message': f'Ошибка: {result["error"]}'
+            'message': f'Ошибка: {e}'
         })
 
+@socketio.on('ai_stream')
+def handle_ai_stream(data):
+    """Потоковый ответ AI провайдера через WebSocket"""
+    message = data.get('message', '')
+    ai_service = data.get('ai_service')
+    stream_id = data.get('stream_id') or str(uuid.uuid4())
+    
+    emit('ai_stream_start', {'stream_id': stream_id})
+    sid = request.sid
+    prompt = f"{provider_ai.config.prompts['chat']}\n\nСообщение пользователя: {message}"
+    
+    def send_delta(delta):
+        loop_emitter.emit('ai_stream_delta', {'stream_id': stream_id, 'delta': delta}, to=sid)
+    
+    def send_end(result):
+        loop_emitter.emit('ai_stream_end', {
+            'stream_id': stream_id,
+            'success': result['success'],
+            'ai_service': result['ai_service'],
+            'error': result.get('error')
+        }, to=sid)
+    
+    # Поток читается в event loop, обработчик события сразу освобождается
+    async_runner.submit(async_ai.stream_response(prompt, send_delta, ai_service), send_end)
+
 if __name__ == '__main__':
     print("🚀 Запускаю Lovable AI Platform...")
     print("📍 Backend: http://localhost:5002")
@@ -0,0 +1,318 @@
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+import httpx
+
+try:
+    from .ai_config import AIConfig
+    from .russian_ai import BaseRussianAI, PROVIDER_TITLES
+    from .response_cache import normalize_prompt
+    from .singleflight import AsyncSingleFlight
+    from .prompt_budget import Files
+except ImportError:
+    # Модуль импортирован из app.py, запущенного как скрипт
+    from ai_config import AIConfig
+    from russian_ai import BaseRussianAI, PROVIDER_TITLES
+    from response_cache import normalize_prompt
+    from singleflight import AsyncSingleFlight
+    from prompt_budget import Files
+
+DeltaCallback = Callable[[str], Union[None, Awaitable[None]]]
+
+
+class AsyncRussianAI(BaseRussianAI):
+    """Асинхронный клиент провайдеров с тем же интерфейсом, что и RussianAI.
+
+    Запрос, ожидающий ответа LLM, не занимает поток: сотни генераций
+    могут висеть в одном event loop.
+    """
+
+    def __init__(self, config: AIConfig = None):
+        super().__init__(config)
+        self._client = None
+        self.flights = AsyncSingleFlight()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Клиент создаётся лениво внутри event loop, в котором будет работать
+        if self._client is None:
+            http2 = self.config.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    http2 = False
+            pool_size = sum(self.config.pool_sizes.values())
+            self._client = httpx.AsyncClient(
+                # httpx повторяет только неудачные подключения
+                transport=httpx.AsyncHTTPTransport(
+                    http2=http2,
+                    retries=self.config.http_retries,
+                    limits=httpx.Limits(
+                        max_connections=pool_size,
+                        max_keepalive_connections=pool_size
+                    )
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate_response(self, prompt: str, ai_service: str = None) -> Dict[str, Any]:
+        """Генерирует ответ используя указанный AI сервис"""
+        if not ai_service:
+            ai_service = self.config.default_ai
+
+        cache_key, cached = self._cache_lookup(prompt, ai_service)
+        if cached is not None:
+            return cached
+
+        result, collapsed = await self.flights.do(
+            (ai_service, normalize_prompt(prompt)),
+            lambda: self._call_provider(prompt, ai_service, cache_key)
+        )
+        return {**result, 'coalesced': True} if collapsed else result
+
+    async def _call_provider(self, prompt: str, ai_service: str, cache_key: Optional[str]) -> Dict[str, Any]:
+        tracked = self.config.is_ai_available(ai_service)
+        if tracked and not self._allow(ai_service):
+            return self._error_response(f"{ai_service} временно недоступен")
+
+        started = time.monotonic()
+        try:
+            result = await self._request(prompt, ai_service)
+        except asyncio.CancelledError:
+            # Проигравший в гонке запрос не должен блокировать пробный запрос
+            if tracked:
+                self.health.release(ai_service)
+            raise
+        if tracked:
+            self._record_call(ai_service, result['success'], time.monotonic() - started, 'async')
+
+        if cache_key is not None and result['success']:
+            self.cache.set(cache_key, result)
+        return result
+
+    async def _request(self, prompt: str, ai_service: str) -> Dict[str, Any]:
+        if ai_service not in PROVIDER_TITLES:
+            return self._fallback_response(prompt)
+
+        title = PROVIDER_TITLES[ai_service]
+        if not self.config.is_ai_available(ai_service):
+            return self._error_response(f"{title} не настроен")
+
+        try:
+            url, headers, data = self._build_request(ai_service, prompt)
+            response = await self._get_client().post(
+                url,
+                headers=headers,
+                json=data,
+                timeout=self.config.provider_timeouts[ai_service]
+            )
+
+            if response.status_code == 200:
+                return self._success_response(ai_service, response.json())
+            return self._error_response(f"{title} ошибка: {response.status_code}")
+
+        except Exception as e:
+            return self._error_response(f"{title} ошибка: {str(e) or type(e).__name__}")
+
+    async def stream_response(self, prompt: str, on_delta: DeltaCallback,
+                              ai_service: str = None) -> Dict[str, Any]:
+        """Потоковый ответ; on_delta может быть обычной функцией или корутиной"""
+        if not ai_service:
+            ai_service = self.config.default_ai
+
+        if ai_service not in ('gigachat', 'localai'):
+            result = await self.generate_response(prompt, ai_service)
+            if result['success']:
+                await _call(on_delta, result['response'])
+            return result
+
+        if not self.config.is_ai_available(ai_service):
+            return self._error_response(f"{ai_service} не настроен")
+        if not self._allow(ai_service):
+            return self._error_response(f"{ai_service} временно недоступен")
+
+        title = PROVIDER_TITLES[ai_service]
+        started = time.monotonic()
+        try:
+            url, headers, data = self._build_request(ai_service, prompt, stream=True)
+            parts = []
+            async with self._get_client().stream(
+                'POST', url, headers=headers, json=data,
+                timeout=self.config.provider_timeouts[ai_service]
+            ) as response:
+                if response.status_code != 200:
+                    result = self._error_response(f"{title} ошибка: {response.status_code}")
+                else:
+                    async for line in response.aiter_lines():
+                        delta = self._parse_sse_line(line.encode('utf-8'))
+                        if delta is None:
+                            break
+                        if delta:
+                            parts.append(delta)
+                            await _call(on_delta, delta)
+                    result = {
+                        'success': True,
+                        'response': ''.join(parts),
+                        'ai_service': ai_service
+                    }
+        except asyncio.CancelledError:
+            self.health.release(ai_service)
+            raise
+        except Exception as e:
+            result = self._error_response(f"{title} ошибка: {str(e) or type(e).__name__}")
+
+        self._record_call(ai_service, result['success'], time.monotonic() - started, 'async_stream')
+        return result
+
+    async def first_success(self, prompt: str, services: List[str]) -> Optional[Dict[str, Any]]:
+        """Возвращает первый успешный ответ из списка сервисов или None"""
+        if self.config.race_mode == 'sequential' or len(services) <= 1:
+            # Общий дедлайн действует и при опросе по очереди
+            deadline = time.monotonic() + self.config.global_deadline
+            for ai_service in services:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    result = await asyncio.wait_for(self.generate_response(prompt, ai_service), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if result['success']:
+                    return result
+            return None
+        return await self._race(prompt, services)
+
+    async def _race(self, prompt: str, services: List[str]) -> Optional[Dict[str, Any]]:
+        """Hedged-опрос как в RussianAI, но проигравшие запросы действительно отменяются"""
+        deadline = time.monotonic() + self.config.global_deadline
+        pending = list(services)
+        tasks = set()
+        next_launch = time.monotonic()
+
+        try:
+            while pending or tasks:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+
+                if pending and (not tasks or now >= next_launch):
+                    tasks.add(asyncio.ensure_future(self.generate_response(prompt, pending.pop(0))))
+                    next_launch = now + self.config.hedge_delay
+                    continue
+
+                timeout = deadline - now
+                if pending:
+                    timeout = min(timeout, max(next_launch - now, 0))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    tasks.discard(task)
+                    result = task.result()
+                    if result['success']:
+                        return result
+                    next_launch = time.monotonic()
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_project(self, description: str, project_type: str = 'html') -> Dict[str, Any]:
+        """Генерирует проект на основе описания"""
+        prompt = self.config.prompts['project_generation'].format(description=description)
+
+        result = await self.first_success(prompt, self.available_services())
+        if result:
+            return self._parse_project_response(result['response'], project_type)
+
+        return self._error_response("Не удалось сгенерировать проект")
+
+    async def improve_project(self, code: Files, focus: Iterable[str] = None) -> Dict[str, Any]:
+        """Улучшает существующий проект"""
+        result, chunks = await self._run_code_task('project_improvement', code, focus)
+        if result:
+            return {
+                'success': True,
+                'improved_code': result['response'],
+                'ai_service': result['ai_service'],
+                'chunks': chunks
+            }
+
+        return self._error_response("Не удалось улучшить проект")
+
+    async def review_code(self, code: Files, focus: Iterable[str] = None) -> Dict[str, Any]:
+        """Код-ревью проекта"""
+        result, chunks = await self._run_code_task('code_review', code, focus)
+        if result:
+            return {
+                'success': True,
+                'review': result['response'],
+                'ai_service': result['ai_service'],
+                'chunks': chunks
+            }
+
+        return self._error_response("Не удалось провести код-ревью")
+
+    async def _run_code_task(self, template_name: str, code: Files, focus: Optional[Iterable[str]]):
+        """Map-reduce как в RussianAI, но части обрабатываются параллельно"""
+        prompts, services = self._plan_code_prompts(
+            template_name, code, focus, self.available_services()
+        )
+        results = await asyncio.gather(*(self.first_success(prompt, services) for prompt in prompts))
+        while len(results) > 1 and all(results):
+            parts = [result['response'] for result in results]
+            merge_prompts = self._merge_prompts(template_name, parts, services)
+            results = await asyncio.gather(*(self.first_success(prompt, services) for prompt in merge_prompts))
+        if not all(results):
+            return None, len(prompts)
+        return results[0], len(prompts)
+
+
+async def _call(callback: DeltaCallback, value: str):
+    outcome = callback(value)
+    if inspect.isawaitable(outcome):
+        await outcome
+
+
+class AsyncRunner:
+    """Event loop в отдельном потоке для вызова корутин из синхронного кода.
+
+    Обработчики Flask-SocketIO синхронные: они отдают корутину в этот
+    цикл и сразу освобождаются, а результат приходит в callback.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='async-ai', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine, callback: Callable[[Any], None] = None):
+        """Запускает корутину; callback получает её результат"""
+        with self._lock:
+            self._in_flight += 1
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+        def finished(done):
+            with self._lock:
+                self._in_flight -= 1
+            if callback is not None:
+                callback(done.result())
+
+        future.add_done_callback(finished)
+        return future
+
+    def in_flight(self) -> int:
+        return self._in_flight
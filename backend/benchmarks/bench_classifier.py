@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк классификатора сообщений SmartAI.
+
+Сравнивает прежний путь (lower() + последовательные any(word in ...))
+с однопроходным автоматом из intent_classifier.
+
+Запуск из папки backend:
+    python benchmarks/bench_classifier.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_classifier import INTENT_KEYWORDS, TOPIC_KEYWORDS, KeywordClassifier
+
+MESSAGES = [
+    "Привет! Как дела?",
+    "Создай мне будильник с красивым дизайном и звуками",
+    "Что умеешь делать?",
+    "Хочу игру на реакцию, чтобы было весело",
+    "Что можно сделать для сайта университета?",
+    "Расскажи подробнее про архитектуру веб-приложений и их производительность " * 3,
+]
+
+
+def legacy_classify(message, intents, topics):
+    """Прежняя логика analyze_message + learn_from_interaction"""
+    message_lower = message.lower()
+    intent = "general"
+    for name, words in intents:
+        if any(word in message_lower for word in words):
+            intent = name
+            break
+
+    message_lower = message.lower()
+    found_topics = []
+    for topic, words in topics.items():
+        if any(word in message_lower for word in words):
+            found_topics.append(topic)
+    return intent, found_topics
+
+
+def synthetic_tables(count, seed=42):
+    """Таблицы с большим числом ключевых слов для проверки масштабирования"""
+    rng = random.Random(seed)
+    alphabet = "абвгдежзиклмнопрстуфхцчшщэюя"
+    intents = [(name, list(words)) for name, words in INTENT_KEYWORDS]
+    for index in range(count):
+        word = ''.join(rng.choice(alphabet) for _ in range(rng.randint(5, 10)))
+        intents[index % len(intents)][1].append(word)
+    return intents
+
+
+def check_parity(classifier):
+    for message in MESSAGES:
+        expected = legacy_classify(message, INTENT_KEYWORDS, TOPIC_KEYWORDS)
+        result = classifier.classify(message)
+        assert (result.intent, result.topics) == expected, (message, result, expected)
+
+
+def bench(label, intents, number):
+    classifier = KeywordClassifier(intents=intents)
+
+    legacy = timeit.timeit(
+        lambda: [legacy_classify(m, intents, TOPIC_KEYWORDS) for m in MESSAGES], number=number
+    )
+    compiled = timeit.timeit(
+        lambda: [classifier.classify(m) for m in MESSAGES], number=number
+    )
+
+    calls = number * len(MESSAGES)
+    print(f"{label:<22} legacy {legacy / calls * 1e6:8.2f} мкс   "
+          f"automaton {compiled / calls * 1e6:8.2f} мкс   x{legacy / compiled:5.2f}")
+
+
+def main():
+    number = int(os.getenv('BENCH_NUMBER', '2000'))
+    check_parity(KeywordClassifier())
+
+    bench("текущие таблицы", INTENT_KEYWORDS, number)
+    for count in (100, 500, 2000):
+        bench(f"+{count} ключевых слов", synthetic_tables(count), number)
+
+
+if __name__ == "__main__":
+    main()
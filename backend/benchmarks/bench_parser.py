@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разбора ответа модели на файлы проекта.
+
+Сравнивает прежний построчный разбор (четыре проверки `in line.lower()`
+и склейка строк через +=) с однопроходным parse_project_files на ответах
+в сотни килобайт. Время на килобайт у нового парсера не должно расти
+с размером ответа.
+
+Запуск из папки backend:
+    python benchmarks/bench_parser.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_parser import parse_project_files
+
+
+def legacy_parse(response):
+    """Прежняя логика RussianAI._parse_project_response"""
+    files = {'index.html': '', 'styles.css': '', 'script.js': '', 'README.md': ''}
+    current_file = None
+    for line in response.split('\n'):
+        if 'index.html' in line.lower():
+            current_file = 'index.html'
+        elif 'styles.css' in line.lower() or 'css' in line.lower():
+            current_file = 'styles.css'
+        elif 'script.js' in line.lower() or 'javascript' in line.lower():
+            current_file = 'script.js'
+        elif 'readme' in line.lower():
+            current_file = 'README.md'
+        elif current_file:
+            files[current_file] += line + '\n'
+    return files
+
+
+def make_response(kilobytes):
+    """Ответ модели из четырёх файлов примерно заданного размера"""
+    per_file = kilobytes * 1024 // 4
+    html = '<div class="card"><span>Элемент</span></div>\n'
+    css = '.card { display: flex; gap: 8px; }\n'
+    js = 'items.forEach(item => render(item));\n'
+    md = '- пункт описания проекта\n'
+    parts = []
+    for name, language, line in (('index.html', 'html', html), ('styles.css', 'css', css),
+                                 ('script.js', 'javascript', js), ('README.md', 'markdown', md)):
+        parts.append(f"### {name}\n```{language}\n{line * (per_file // len(line.encode()))}```\n")
+    return '\n'.join(parts)
+
+
+def measure(function, response, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(response)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    repeat = int(os.getenv('BENCH_REPEAT', '5'))
+    sample = parse_project_files(make_response(8))
+    assert sorted(sample) == ['README.md', 'index.html', 'script.js', 'styles.css'], sorted(sample)
+
+    for kilobytes in (50, 200, 800):
+        response = make_response(kilobytes)
+        legacy = measure(legacy_parse, response, repeat)
+        parsed = measure(parse_project_files, response, repeat)
+        print(f"{kilobytes:>4} КБ   legacy {legacy * 1e3:8.2f} мс ({legacy / kilobytes * 1e6:6.1f} мкс/КБ)   "
+              f"parser {parsed * 1e3:8.2f} мс ({parsed / kilobytes * 1e6:6.1f} мкс/КБ)")
+
+
+if __name__ == "__main__":
+    main()
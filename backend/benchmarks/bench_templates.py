@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк рендера шаблонов проектов.
+
+1. Прежние методы ProjectGenerator с f-строками против скомпилированных
+   шаблонов из project_templates/html.
+2. Старт реестра и рендер при 4 и при сотнях типов проектов: время не
+   должно расти с числом типов.
+
+Запуск из папки backend:
+    python benchmarks/bench_templates.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from template_engine import TemplateRegistry
+
+TEMPLATES_DIR = os.path.join(BACKEND_DIR, 'project_templates')
+CONTEXT = {"project_name": "Будильник", "description": "Стильный будильник со звуковыми сигналами"}
+
+
+# В прежнем коде стили и скрипт были строковыми литералами методов
+with open(os.path.join(TEMPLATES_DIR, 'html', 'styles.css'), encoding='utf-8') as f:
+    LEGACY_STYLES = f.read()
+with open(os.path.join(TEMPLATES_DIR, 'html', 'script.js'), encoding='utf-8') as f:
+    LEGACY_SCRIPT = f.read()
+
+
+def legacy_render(project_name, description):
+    """Прежние get_html_* из ProjectGenerator"""
+    index = f"""<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{project_name}</title>
+    <link rel="stylesheet" href="styles.css">
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>{project_name}</h1>
+            <p>{description}</p>
+        </header>
+        <main>
+            <p>Создано с помощью Lovable AI</p>
+        </main>
+    </div>
+    <script src="script.js"></script>
+</body>
+</html>"""
+    readme = f"""# {project_name}
+
+{description}
+
+## Создано с помощью Lovable AI
+
+### Запуск
+
+Просто откройте index.html в браузере или используйте локальный сервер:
+
+```bash
+python -m http.server 8000
+```
+
+Затем откройте http://localhost:8000"""
+    return {"index.html": index, "styles.css": LEGACY_STYLES, "script.js": LEGACY_SCRIPT, "README.md": readme}
+
+
+def make_many_types(count):
+    """Копия каталога шаблонов с count дополнительными типами"""
+    directory = tempfile.mkdtemp(prefix='templates-')
+    shutil.copytree(TEMPLATES_DIR, directory, dirs_exist_ok=True)
+    for index in range(count):
+        shutil.copytree(os.path.join(TEMPLATES_DIR, 'landing'), os.path.join(directory, f"type{index}"))
+    return directory
+
+
+def bench_registry(label, directory, number):
+    started = time.perf_counter()
+    registry = TemplateRegistry(directory)
+    startup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    registry.render('landing', CONTEXT)
+    first = time.perf_counter() - started
+
+    steady = timeit.timeit(lambda: registry.render('landing', CONTEXT), number=number) / number
+    print(f"{label:<16} старт {startup * 1e3:7.2f} мс   первый рендер {first * 1e3:6.2f} мс   "
+          f"рендер {steady * 1e6:7.2f} мкс   типов: {len(registry.types)}")
+
+
+def main():
+    number = int(os.getenv('BENCH_NUMBER', '20000'))
+
+    registry = TemplateRegistry(TEMPLATES_DIR)
+    registry.preload()
+    compiled = timeit.timeit(lambda: registry.render('html', CONTEXT), number=number) / number
+    legacy = timeit.timeit(lambda: legacy_render(**CONTEXT), number=number) / number
+    print(f"html: f-строки {legacy * 1e6:7.2f} мкс   скомпилированные шаблоны {compiled * 1e6:7.2f} мкс")
+
+    bench_registry("4 типа", TEMPLATES_DIR, number)
+    for count in (100, 500):
+        directory = make_many_types(count)
+        try:
+            bench_registry(f"+{count} типов", directory, number)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
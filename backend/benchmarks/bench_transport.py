@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк HTTP транспорта к провайдерам на локальном stub-сервере.
+
+Сравнивает стандартный requests.Session() (пул 10 соединений на хост)
+с сессией из transport.build_session при одинаковой конкурентности и
+выводит, сколько соединений было открыто и сколько переиспользовано.
+
+Запуск из папки backend:
+    python benchmarks/bench_transport.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_config import AIConfig
+from transport import build_session, pool_stats
+
+RESPONSE = json.dumps({
+    "choices": [{"message": {"content": "ok"}}]
+}).encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1, чтобы соединения держались открытыми между запросами
+    protocol_version = 'HTTP/1.1'
+    latency = 0.005
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(session, url, total, concurrency):
+    payload = {"model": "stub", "messages": [{"role": "user", "content": "привет"}]}
+
+    def call(_):
+        response = session.post(url, json=payload, timeout=10)
+        response.content
+        return response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        statuses = list(executor.map(call, range(total)))
+    elapsed = time.perf_counter() - started
+    assert all(status == 200 for status in statuses)
+    return elapsed
+
+
+def main():
+    total = int(os.getenv('BENCH_REQUESTS', '2000'))
+    concurrency = int(os.getenv('BENCH_CONCURRENCY', '32'))
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    url = f"{base}/v1/chat/completions"
+
+    os.environ['LOCALAI_URL'] = base
+    os.environ.setdefault('LOCALAI_POOL_SIZE', str(concurrency))
+    config = AIConfig()
+
+    sessions = [
+        ("requests.Session()", requests.Session()),
+        ("transport.build_session", build_session(config)),
+    ]
+    print(f"{total} запросов, конкурентность {concurrency}")
+    for label, session in sessions:
+        elapsed = run(session, url, total, concurrency)
+        stats = pool_stats(session)
+        opened = sum(entry["connections_opened"] for entry in stats.values())
+        reused = sum(entry["connections_reused"] for entry in stats.values())
+        print(f"{label:<24} {total / elapsed:8.1f} req/s   "
+              f"соединений открыто {opened:5d}   переиспользовано {reused:5d}")
+        session.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
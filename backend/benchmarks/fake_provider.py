@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Локальный stub AI провайдеров для нагрузочных тестов.
+
+Отвечает в форматах, которые разбирает russian_ai.py:
+    POST /api/v1/chat/completions        — GigaChat (OpenAI-совместимый)
+    POST /v1/chat/completions            — LocalAI (OpenAI-совместимый)
+    POST /foundationModels/v1/completion — Yandex GPT
+При "stream": true OpenAI-совместимые пути отдают SSE поток фрагментов.
+
+Задержка, разброс, доля ошибок и параметры потока настраиваются.
+Отдельный запуск (из папки backend):
+    python benchmarks/fake_provider.py --port 8090 --latency 0.2 --error-rate 0.05
+
+Приложение направляется на stub переменными окружения:
+    GIGACHAT_API_KEY=fake GIGACHAT_URL=http://127.0.0.1:8090
+    YANDEX_API_KEY=fake YANDEX_URL=http://127.0.0.1:8090
+    LOCALAI_ENABLED=true LOCALAI_URL=http://127.0.0.1:8090
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+OPENAI_PATHS = ('/api/v1/chat/completions', '/v1/chat/completions')
+YANDEX_PATH = '/foundationModels/v1/completion'
+
+DEFAULT_TEXT = (
+    "Вот простой проект:\n"
+    "```html\n<!DOCTYPE html>\n<html><body><h1>Привет</h1></body></html>\n```\n"
+    "```css\nbody { font-family: sans-serif; }\n```\n"
+    "```javascript\nconsole.log('ok');\n```"
+)
+
+
+class FakeProviderConfig:
+    def __init__(self, latency=0.05, jitter=0.0, error_rate=0.0, error_status=500,
+                 stream_chunks=20, chunk_delay=0.005, text=DEFAULT_TEXT, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stream_chunks = stream_chunks
+        self.chunk_delay = chunk_delay
+        self.text = text
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def next_call(self):
+        """Задержка до ответа и признак ошибки для очередного запроса"""
+        with self.lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return delay, failed
+
+    def chunks(self):
+        size = max(1, -(-len(self.text) // max(1, self.stream_chunks)))
+        return [self.text[index:index + size] for index in range(0, len(self.text), size)]
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1, чтобы пул соединений клиента переиспользовал их
+    protocol_version = 'HTTP/1.1'
+    config = FakeProviderConfig()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            data = {}
+
+        if self.path not in OPENAI_PATHS and self.path != YANDEX_PATH:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        delay, failed = self.config.next_call()
+        time.sleep(delay)
+        if failed:
+            self._send_json(self.config.error_status, {"error": "fake provider error"})
+            return
+
+        if self.path == YANDEX_PATH:
+            self._send_json(200, {
+                "result": {
+                    "alternatives": [{"message": {"role": "assistant"}, "text": self.config.text}],
+                    "usage": {"inputTextTokens": "0", "completionTokens": "0"}
+                }
+            })
+        elif data.get('stream'):
+            self._send_stream(data.get('model', 'fake'))
+        else:
+            self._send_json(200, {
+                "object": "chat.completion",
+                "model": data.get('model', 'fake'),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.config.text},
+                    "finish_reason": "stop"
+                }]
+            })
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, model):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for text in self.config.chunks():
+            chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": text}}]}
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+            time.sleep(self.config.chunk_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_provider(config=None, host='127.0.0.1', port=0):
+    """Запускает stub в фоновом потоке; возвращает (server, base_url)"""
+    handler = type('Handler', (FakeProviderHandler,), {'config': config or FakeProviderConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-provider', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def provider_env(base_url):
+    """Переменные окружения, направляющие все провайдеры на stub"""
+    return {
+        'GIGACHAT_API_KEY': 'fake',
+        'GIGACHAT_URL': base_url,
+        'YANDEX_API_KEY': 'fake',
+        'YANDEX_URL': base_url,
+        'LOCALAI_ENABLED': 'true',
+        'LOCALAI_URL': base_url
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub AI провайдеров")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.05, help="задержка ответа, с")
+    parser.add_argument('--jitter', type=float, default=0.0, help="разброс задержки ±, с")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="доля ответов с ошибкой")
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--stream-chunks', type=int, default=20)
+    parser.add_argument('--chunk-delay', type=float, default=0.005)
+    args = parser.parse_args()
+
+    config = FakeProviderConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        error_status=args.error_status, stream_chunks=args.stream_chunks, chunk_delay=args.chunk_delay
+    )
+    server, base_url = start_fake_provider(config, args.host, args.port)
+    print(f"🧪 Fake provider: {base_url}")
+    for name, value in provider_env(base_url).items():
+        print(f"   {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест приложения с локальным stub AI провайдеров.
+
+По умолчанию поднимает fake_provider и сервер приложения в отдельном
+процессе (во временной папке, без очистки проектов), затем гоняет
+сценарии с заданной конкурентностью и печатает пропускную способность и
+p50/p95/p99 задержек:
+
+    chat            POST /api/chat
+    generate        POST /api/generate-project и опрос /api/jobs/<id> до готовности
+    download        GET /api/download/<id> заранее созданных проектов
+    socket_generate событие generate_project до project_status completed
+    ai_stream       событие ai_stream до ai_stream_end (идёт через stub провайдера)
+
+Запуск из папки backend:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --scenario chat --scenario download -c 32 -n 2000
+    python benchmarks/load_test.py --url http://localhost:5002   # уже запущенный сервер
+
+Сравнение с прошлым прогоном (код выхода 1, если p95 вырос больше допуска):
+    python benchmarks/load_test.py --json baseline.json
+    python benchmarks/load_test.py --baseline baseline.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import requests
+import socketio
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_provider import FakeProviderConfig, provider_env, start_fake_provider
+
+SCENARIOS = ('chat', 'generate', 'download', 'socket_generate', 'ai_stream')
+
+MESSAGES = [
+    "Привет! Что ты умеешь?",
+    "Создай калькулятор",
+    "Сделай игру змейка",
+    "Как улучшить дизайн сайта?",
+    "Нужен лендинг для кофейни"
+]
+
+SERVER_BOOTSTRAP = (
+    "import sys, app; "
+    "app.socketio.run(app.app, host='127.0.0.1', port=int(sys.argv[1]), allow_unsafe_werkzeug=True)"
+)
+
+
+def percentile(values, q):
+    """Перцентиль по ближайшему рангу из отсортированного списка"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+class ScenarioResult:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.elapsed = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self.lock:
+            if ok:
+                self.latencies.append(latency)
+            else:
+                self.errors += 1
+
+    def summary(self):
+        values = sorted(self.latencies)
+        total = len(values) + self.errors
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "rps": round(total / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1e3, 2),
+            "p95_ms": round(percentile(values, 95) * 1e3, 2),
+            "p99_ms": round(percentile(values, 99) * 1e3, 2),
+            "max_ms": round(values[-1] * 1e3, 2) if values else 0.0
+        }
+
+
+def http_worker(base_url, method, path_factory, body_factory=None):
+    """Фабрика вызовов одного HTTP запроса; у каждого потока своя сессия"""
+    def factory():
+        session = requests.Session()
+
+        def call():
+            response = session.request(
+                method, base_url + path_factory(),
+                json=body_factory() if body_factory else None, timeout=60
+            )
+            response.content
+            if response.status_code >= 400:
+                raise RuntimeError(f"HTTP {response.status_code}")
+        return call
+    return factory
+
+
+def generate_worker(base_url, poll_interval):
+    def factory():
+        session = requests.Session()
+
+        def call():
+            response = session.post(base_url + '/api/generate-project', json={
+                "description": random.choice(MESSAGES), "project_name": "Нагрузка"
+            }, timeout=60)
+            if response.status_code != 202:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            job_id = response.json()['job_id']
+            while True:
+                job = session.get(f"{base_url}/api/jobs/{job_id}", timeout=60).json()
+                if job['status'] == 'completed':
+                    return
+                if job['status'] == 'error':
+                    raise RuntimeError(job['message'])
+                time.sleep(poll_interval)
+        return call
+    return factory
+
+
+def socket_worker(base_url, event, data_factory, done_event, is_done, transports):
+    """Фабрика вызовов через Socket.IO: emit и ожидание завершающего события"""
+    def factory():
+        client = socketio.Client(reconnection=False)
+        state = {"done": threading.Event(), "ok": False, "key": None}
+
+        @client.on(done_event)
+        def on_done(payload):
+            finished = is_done(payload, state["key"])
+            if finished is not None:
+                state["ok"] = finished
+                state["done"].set()
+
+        client.connect(base_url, transports=transports, wait_timeout=30)
+
+        def call():
+            state["done"].clear()
+            state["ok"] = False
+            data, state["key"] = data_factory()
+            client.emit(event, data)
+            if not state["done"].wait(60):
+                raise RuntimeError(f"нет события {done_event}")
+            if not state["ok"]:
+                raise RuntimeError(f"{done_event}: ошибка")
+        call.close = client.disconnect
+        return call
+    return factory
+
+
+def project_done(payload, key):
+    if payload.get('status') == 'completed':
+        return True
+    if payload.get('status') == 'error':
+        return False
+    return None
+
+
+def stream_done(payload, key):
+    if payload.get('stream_id') != key:
+        return None
+    return bool(payload.get('success'))
+
+
+def stream_data():
+    stream_id = str(uuid.uuid4())
+    return {"message": random.choice(MESSAGES), "stream_id": stream_id}, stream_id
+
+
+def run_scenario(name, factory, total, concurrency, warmup):
+    """Выполняет total вызовов в concurrency потоках, первые warmup не учитываются"""
+    result = ScenarioResult(name)
+    counter = iter(range(total + warmup))
+    counter_lock = threading.Lock()
+    errors = []
+
+    def worker():
+        try:
+            call = factory()
+        except Exception as e:
+            errors.append(e)
+            return
+        try:
+            while True:
+                with counter_lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    call()
+                    ok = True
+                except Exception:
+                    ok = False
+                if index >= warmup:
+                    result.record(time.perf_counter() - started, ok)
+        finally:
+            close = getattr(call, 'close', None)
+            if close is not None:
+                close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - started
+    if errors and not result.latencies:
+        raise RuntimeError(f"{name}: не удалось подготовить клиентов: {errors[0]}")
+    return result
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(provider_url, workdir):
+    """Сервер приложения в отдельном процессе, чтобы клиенты не делили с ним GIL"""
+    port = free_port()
+    env = {
+        **os.environ,
+        **provider_env(provider_url),
+        'PYTHONPATH': BACKEND_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''),
+        'JANITOR_ENABLED': 'false',
+        # Иначе повторяющиеся промпты отвечаются из кэша, минуя провайдера
+        'AI_CACHE_ENABLED': 'false',
+        'PROJECT_CATALOG_PATH': os.path.join(workdir, 'project_catalog.sqlite3')
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER_BOOTSTRAP, str(port)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("сервер приложения завершился при старте")
+        try:
+            requests.get(base_url + '/api/ai/status', timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("сервер приложения не ответил за 30 с")
+
+
+def create_projects(base_url, count):
+    """Проекты для сценария download"""
+    call = generate_worker(base_url, 0.02)()
+    for _ in range(count):
+        call()
+    response = requests.get(base_url + '/api/projects', params={"limit": count}, timeout=60)
+    return [project['id'] for project in response.json()['projects']]
+
+
+def socket_transports(value):
+    """Транспорты Socket.IO клиента; websocket требует пакета websocket-client"""
+    transports = value.split(',')
+    if 'websocket' in transports:
+        try:
+            import websocket  # noqa: F401
+        except ImportError:
+            print("⚠️ websocket-client не установлен, сокет-сценарии идут через polling")
+            transports = [transport for transport in transports if transport != 'websocket'] or ['polling']
+    return transports
+
+
+def build_scenarios(base_url, names, args):
+    transports = socket_transports(args.socket_transport)
+    scenarios = {}
+    for name in names:
+        if name == 'chat':
+            scenarios[name] = http_worker(
+                base_url, 'POST', lambda: '/api/chat', lambda: {"message": random.choice(MESSAGES)}
+            )
+        elif name == 'generate':
+            scenarios[name] = generate_worker(base_url, args.poll_interval)
+        elif name == 'download':
+            project_ids = create_projects(base_url, args.download_projects)
+            scenarios[name] = http_worker(
+                base_url, 'GET', lambda: f"/api/download/{random.choice(project_ids)}"
+            )
+        elif name == 'socket_generate':
+            scenarios[name] = socket_worker(
+                base_url, 'generate_project',
+                lambda: ({"description": random.choice(MESSAGES), "project_name": "Нагрузка"}, None),
+                'project_status', project_done, transports
+            )
+        elif name == 'ai_stream':
+            scenarios[name] = socket_worker(
+                base_url, 'ai_stream', stream_data, 'ai_stream_end', stream_done, transports
+            )
+    return scenarios
+
+
+def compare(results, baseline, max_regression):
+    """Сценарии, у которых p95 вырос больше чем на max_regression"""
+    regressions = []
+    for name, summary in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('p95_ms'):
+            continue
+        growth = summary['p95_ms'] / previous['p95_ms'] - 1
+        if growth > max_regression:
+            regressions.append(f"{name}: p95 {previous['p95_ms']} → {summary['p95_ms']} мс (+{growth:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест Lovable AI Platform")
+    parser.add_argument('--url', help="адрес запущенного сервера (по умолчанию поднимается свой)")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help="сценарий (можно несколько, по умолчанию все)")
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-n', '--requests', type=int, default=500, help="запросов на сценарий")
+    parser.add_argument('--warmup', type=int, default=20, help="неучитываемых запросов в начале")
+    parser.add_argument('--poll-interval', type=float, default=0.02)
+    parser.add_argument('--download-projects', type=int, default=20)
+    parser.add_argument('--socket-transport', default='polling,websocket')
+    parser.add_argument('--provider-latency', type=float, default=0.05)
+    parser.add_argument('--provider-jitter', type=float, default=0.01)
+    parser.add_argument('--provider-error-rate', type=float, default=0.0)
+    parser.add_argument('--provider-stream-chunks', type=int, default=20)
+    parser.add_argument('--json', help="сохранить результаты в файл")
+    parser.add_argument('--baseline', help="результаты прошлого прогона для сравнения")
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    process = None
+    workdir = None
+    base_url = args.url
+    if base_url is None:
+        provider = FakeProviderConfig(
+            latency=args.provider_latency, jitter=args.provider_jitter,
+            error_rate=args.provider_error_rate, stream_chunks=args.provider_stream_chunks
+        )
+        provider_server, provider_url = start_fake_provider(provider)
+        workdir = tempfile.mkdtemp(prefix='lovable-load-')
+        process, base_url = start_server(provider_url, workdir)
+        print(f"🧪 Сервер {base_url}, fake provider {provider_url}")
+
+    try:
+        scenarios = build_scenarios(base_url, names, args)
+        print(f"{'сценарий':<16} {'запросов':>8} {'ошибок':>7} {'rps':>8} "
+              f"{'p50 мс':>9} {'p95 мс':>9} {'p99 мс':>9} {'max мс':>9}")
+        results = {}
+        for name in names:
+            summary = run_scenario(
+                name, scenarios[name], args.requests, args.concurrency, args.warmup
+            ).summary()
+            results[name] = summary
+            print(f"{name:<16} {summary['requests']:>8} {summary['errors']:>7} {summary['rps']:>8} "
+                  f"{summary['p50_ms']:>9} {summary['p95_ms']:>9} {summary['p99_ms']:>9} "
+                  f"{summary['max_ms']:>9}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+            provider_server.shutdown()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"concurrency": args.concurrency, "results": results}, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.max_regression)
+        for line in regressions:
+            print(f"❌ {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ Регрессий p95 нет")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from project_archive import build_zip_bytes, patch_zip_bytes
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def manifest_digest(manifest: Dict[str, str]) -> str:
+    """Digest набора файлов по манифесту {путь: hash блоба}; он же ETag архива"""
+    return hash_bytes(''.join(
+        f"{path}\0{blob_hash}\n" for path, blob_hash in sorted(manifest.items())
+    ).encode('utf-8'))
+
+
+def render_key(*parts) -> str:
+    """Ключ рендера: хэш от типа шаблона и входных параметров"""
+    return hash_bytes('\0'.join(str(part) for part in parts).encode('utf-8'))
+
+
+def diff_manifests(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+    """Сравнивает манифесты по хэшам файлов"""
+    return {
+        "added": sorted(path for path in new if path not in old),
+        "modified": sorted(path for path in new if path in old and new[path] != old[path]),
+        "removed": sorted(path for path in old if path not in new),
+        "unchanged": sorted(path for path in new if old.get(path) == new[path])
+    }
+
+
+class ContentStore:
+    """Контентно-адресуемое хранилище файлов и архивов проектов.
+
+    Одинаковые файлы хранятся одним блобом, одинаковые наборы файлов
+    (манифесты) — одним собранным архивом. Манифесты вытесняются по LRU,
+    когда суммарный размер блобов и архивов превышает max_bytes.
+    """
+
+    def __init__(self, max_bytes: int, max_refs: int = 1024):
+        self.max_bytes = max_bytes
+        self.max_refs = max_refs
+        self._lock = threading.Lock()
+        # hash блоба -> [содержимое, число ссылок]
+        self._blobs = {}
+        # digest манифеста -> {путь: hash блоба}, порядок = LRU
+        self._manifests = OrderedDict()
+        # digest манифеста -> собранный ZIP
+        self._archives = {}
+        # ключ рендера -> digest манифеста
+        self._renders = OrderedDict()
+        # project_id -> digest манифеста
+        self._projects = OrderedDict()
+        self._size = 0
+        self.stats_counters = {
+            "render_hits": 0,
+            "render_misses": 0,
+            "archive_hits": 0,
+            "archive_builds": 0,
+            "archive_patches": 0,
+            "evictions": 0
+        }
+
+    def put_files(self, files: Dict[str, str]) -> str:
+        """Сохраняет набор файлов и возвращает digest манифеста"""
+        manifest = {}
+        encoded = {}
+        for path, content in files.items():
+            data = content.encode('utf-8') if isinstance(content, str) else content
+            blob_hash = hash_bytes(data)
+            manifest[path] = blob_hash
+            encoded[blob_hash] = data
+
+        digest = manifest_digest(manifest)
+
+        with self._lock:
+            if digest in self._manifests:
+                self._manifests.move_to_end(digest)
+                return digest
+            for blob_hash in manifest.values():
+                entry = self._blobs.get(blob_hash)
+                if entry is None:
+                    data = encoded[blob_hash]
+                    self._blobs[blob_hash] = [data, 1]
+                    self._size += len(data)
+                else:
+                    entry[1] += 1
+            self._manifests[digest] = manifest
+            self._evict_locked(keep=digest)
+        return digest
+
+    def get_files(self, digest: str) -> Optional[Dict[str, bytes]]:
+        """Возвращает содержимое файлов манифеста"""
+        with self._lock:
+            manifest = self._manifests.get(digest)
+            if manifest is None:
+                return None
+            self._manifests.move_to_end(digest)
+            return {path: self._blobs[blob_hash][0] for path, blob_hash in manifest.items()}
+
+    def get_archive(self, digest: str) -> Optional[bytes]:
+        """Возвращает ZIP манифеста, собирая его один раз"""
+        with self._lock:
+            archive = self._archives.get(digest)
+            if archive is not None:
+                self._manifests.move_to_end(digest)
+                self.stats_counters["archive_hits"] += 1
+                return archive
+
+        files = self.get_files(digest)
+        if files is None:
+            return None
+        archive = build_zip_bytes(files)
+
+        with self._lock:
+            if digest not in self._manifests:
+                return archive
+            if digest not in self._archives:
+                self._store_archive_locked(digest, archive)
+                self.stats_counters["archive_builds"] += 1
+                self._evict_locked(keep=digest)
+            return self._archives.get(digest, archive)
+
+    def get_manifest(self, digest: str) -> Optional[Dict[str, str]]:
+        """Возвращает копию манифеста {путь: hash блоба}"""
+        with self._lock:
+            manifest = self._manifests.get(digest)
+            return dict(manifest) if manifest is not None else None
+
+    def patch_archive(self, base_digest: str, digest: str,
+                      changed: Dict[str, bytes], removed: Iterable[str] = ()) -> bool:
+        """Собирает архив манифеста digest из уже собранного архива base_digest.
+
+        Пережимаются только изменённые файлы. Если архива базового
+        манифеста нет, ничего не делает: архив соберётся целиком при
+        первом скачивании.
+        """
+        with self._lock:
+            base = self._archives.get(base_digest)
+            if base is None or digest in self._archives:
+                return digest in self._archives
+        archive = patch_zip_bytes(base, changed, removed)
+
+        with self._lock:
+            if digest not in self._manifests:
+                return False
+            if digest not in self._archives:
+                self._store_archive_locked(digest, archive)
+                self.stats_counters["archive_patches"] += 1
+                self._evict_locked(keep=digest)
+            return True
+
+    def lookup_render(self, key: str) -> Optional[str]:
+        """Ищет ранее отрендеренный манифест по ключу рендера"""
+        with self._lock:
+            digest = self._renders.get(key)
+            if digest is None or digest not in self._manifests:
+                self.stats_counters["render_misses"] += 1
+                return None
+            self._renders.move_to_end(key)
+            self._manifests.move_to_end(digest)
+            self.stats_counters["render_hits"] += 1
+            return digest
+
+    def remember_render(self, key: str, digest: str):
+        with self._lock:
+            self._put_ref_locked(self._renders, key, digest)
+
+    def bind_project(self, project_id: str, digest: str):
+        """Привязывает проект к манифесту"""
+        with self._lock:
+            self._put_ref_locked(self._projects, project_id, digest)
+
+    def forget_project(self, project_id: str):
+        with self._lock:
+            self._projects.pop(project_id, None)
+
+    def project_digest(self, project_id: str) -> Optional[str]:
+        with self._lock:
+            digest = self._projects.get(project_id)
+            if digest is None or digest not in self._manifests:
+                return None
+            return digest
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "blobs": len(self._blobs),
+                "manifests": len(self._manifests),
+                "archives": len(self._archives),
+                "projects": len(self._projects),
+                **self.stats_counters
+            }
+
+    def _put_ref_locked(self, refs, key, digest):
+        refs[key] = digest
+        refs.move_to_end(key)
+        while len(refs) > self.max_refs:
+            refs.popitem(last=False)
+
+    def _store_archive_locked(self, digest, archive):
+        self._archives[digest] = archive
+        self._size += len(archive)
+
+    def _evict_locked(self, keep=None):
+        """Вытесняет самые давно использованные манифесты до лимита размера"""
+        while self._size > self.max_bytes and self._manifests:
+            digest = next(iter(self._manifests))
+            if digest == keep:
+                # Единственный оставшийся манифест больше лимита — держим его
+                if len(self._manifests) == 1:
+                    break
+                self._manifests.move_to_end(digest)
+                continue
+            self._drop_manifest_locked(digest)
+
+    def _drop_manifest_locked(self, digest):
+        manifest = self._manifests.pop(digest)
+        archive = self._archives.pop(digest, None)
+        if archive is not None:
+            self._size -= len(archive)
+        for blob_hash in manifest.values():
+            entry = self._blobs[blob_hash]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._blobs[blob_hash]
+                self._size -= len(entry[0])
+        self.stats_counters["evictions"] += 1
@@ -0,0 +1,34 @@
+"""
+Конфигурация gunicorn для wsgi.py.
+
+Один экземпляр — один воркер gthread: задачи генерации, сессии агента и
+кэш архивов живут в памяти процесса, и GET /api/jobs/<id> знает только
+задачи своего процесса. Для нескольких ядер запускается несколько
+экземпляров на разных портах за балансировщиком со sticky-маршрутизацией
+(nginx ip_hash), события между ними идут через SOCKETIO_MESSAGE_QUEUE.
+
+PORT                      порт экземпляра
+GUNICORN_THREADS          потоки воркера
+SOCKETIO_MESSAGE_QUEUE    очередь событий между экземплярами (redis://...)
+"""
+
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5002')}"
+workers = 1
+threads = int(os.getenv('GUNICORN_THREADS', '100'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+
+# gthread: задачи генерации и event loop асинхронного клиента работают в
+# обычных потоках и не требуют monkey-патчинга; websocket обслуживает
+# simple-websocket
+worker_class = 'gthread'
+
+# gunicorn раздаёт запросы своим воркерам без sticky-сессий, поэтому
+# несколько воркеров в одном экземпляре не поддерживаются
+if int(os.getenv('WEB_CONCURRENCY', '1')) > 1:
+    print("⚠️ WEB_CONCURRENCY > 1 не поддерживается: состояние задач и сессий "
+          "хранится в процессе. Запускаю один воркер; для нескольких ядер "
+          "поднимите несколько экземпляров за балансировщиком с ip_hash")
@@ -0,0 +1,142 @@
+from collections import deque, namedtuple
+
+# Ключевые слова задаются в нижнем регистре.
+# Намерения в порядке приоритета: побеждает первое совпавшее
+INTENT_KEYWORDS = [
+    ("greeting", ["привет", "здравствуй", "добрый", "hi", "hello"]),
+    ("wellbeing", ["как дела", "как ты", "как поживаешь"]),
+    ("create_project", ["создай", "сделай", "построй", "разработай", "напиши"]),
+    ("capabilities", ["что умеешь", "возможности", "функции", "помощь"]),
+    ("game_discussion", ["игра", "game", "игр", "развлечение", "весело"]),
+    ("suggestions", ["что можно", "что думаешь", "как думаешь", "предложи", "идеи"]),
+]
+
+# Темы, которые агент запоминает как предпочтения пользователя
+TOPIC_KEYWORDS = {
+    "игра": ["игра", "game"],
+    "таймер": ["будильник", "таймер"],
+}
+
+# Что именно просят создать: побеждает первое правило, все слова которого найдены
+PROJECT_KINDS = [
+    ("calculator", ["калькулятор"]),
+    ("alarm", ["будильник"]),
+    ("game", ["игр"]),
+    ("university", ["сайт", "университет"]),
+]
+
+Classification = namedtuple("Classification", "intent topics project_kind")
+
+
+class KeywordClassifier:
+    """Однопроходный классификатор сообщений на автомате Ахо-Корасик.
+
+    Автомат строится один раз по таблицам ключевых слов, после чего
+    сообщение просматривается за один проход независимо от числа слов.
+    """
+
+    def __init__(self, intents=INTENT_KEYWORDS, topics=TOPIC_KEYWORDS,
+                 project_kinds=PROJECT_KINDS, default_intent="general"):
+        self.default_intent = default_intent
+        self.intent_priority = {intent: index for index, (intent, _) in enumerate(intents)}
+        self.topics = list(topics)
+        self.project_kinds = [(kind, frozenset(words)) for kind, words in project_kinds]
+
+        keywords = set()
+        for _, words in intents:
+            keywords.update(words)
+        for words in topics.values():
+            keywords.update(words)
+        for _, words in self.project_kinds:
+            keywords.update(words)
+
+        # Что означает каждое ключевое слово
+        labels = {}
+        for intent, words in intents:
+            for word in words:
+                labels.setdefault(word, set()).add(("intent", intent))
+        for topic, words in topics.items():
+            for word in words:
+                labels.setdefault(word, set()).add(("topic", topic))
+        self._labels = labels
+
+        self._build(keywords)
+
+    def _build(self, keywords):
+        # Бор: переходы и выходы каждого состояния
+        goto = [{}]
+        outputs = [set()]
+        for word in keywords:
+            state = 0
+            for char in word:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(word)
+
+        # Обход в ширину: ссылки-откаты сразу разворачиваются в полную
+        # таблицу переходов, чтобы на каждый символ был ровно один поиск в словаре
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            if state:
+                transitions = dict(delta[fail[state]])
+                transitions.update(goto[state])
+                delta[state] = transitions
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(char, 0) if state else 0
+                outputs[next_state] |= outputs[fail[next_state]]
+                queue.append(next_state)
+
+        self._delta = delta
+        self._out = [frozenset(words) for words in outputs]
+
+    def find_keywords(self, text):
+        """Возвращает множество ключевых слов, встречающихся в тексте"""
+        delta = self._delta
+        out = self._out
+        matched = []
+        state = 0
+        for char in text.lower():
+            state = delta[state].get(char, 0)
+            if out[state]:
+                matched.append(out[state])
+        return set().union(*matched)
+
+    def classify(self, text):
+        """Определяет намерение, темы и тип проекта за один проход"""
+        found = self.find_keywords(text)
+
+        intent = self.default_intent
+        best = len(self.intent_priority)
+        topics = []
+        for word in found:
+            for kind, label in self._labels.get(word, ()):
+                if kind == "intent":
+                    priority = self.intent_priority[label]
+                    if priority < best:
+                        best = priority
+                        intent = label
+                elif label not in topics:
+                    topics.append(label)
+        # Порядок тем как в таблице, чтобы результат был детерминированным
+        topics.sort(key=self.topics.index)
+
+        project_kind = None
+        for kind, words in self.project_kinds:
+            if words <= found:
+                project_kind = kind
+                break
+
+        return Classification(intent, topics, project_kind)
+
+
+# Классификатор по умолчанию строится один раз при импорте
+default_classifier = KeywordClassifier()
@@ -0,0 +1,174 @@
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировка между процессами недоступна
+    fcntl = None
+
+
+def tree_usage(path: str):
+    """Возвращает (байты, inode) файлов и папок внутри path, включая её саму"""
+    size, inodes = 0, 1
+    for root, dirs, files in os.walk(path):
+        inodes += len(dirs) + len(files)
+        for filename in files:
+            try:
+                size += os.path.getsize(os.path.join(root, filename))
+            except OSError:
+                pass
+    return size, inodes
+
+
+class Janitor:
+    """Фоновая очистка PROJECTS_DIR и TEMP_DIR.
+
+    За один проход сначала удаляются устаревшие архивы в TEMP_DIR (их
+    можно собрать заново), затем проекты сверх MAX_PROJECTS_PER_USER у
+    каждого владельца и проекты, не обновлявшиеся дольше project_ttl.
+    Работа идёт пачками по batch_size с паузой между ними, чтобы не
+    занимать диск и GIL надолго.
+    """
+
+    def __init__(self, resolver, catalog,
+                 max_per_user: int, project_ttl: float, archive_ttl: float,
+                 batch_size: int = 100, pause: float = 0.05,
+                 on_remove: Optional[Callable[[str], None]] = None):
+        self.resolver = resolver
+        self.catalog = catalog
+        self.max_per_user = max_per_user
+        self.project_ttl = project_ttl
+        self.archive_ttl = archive_ttl
+        self.batch_size = batch_size
+        self.pause = pause
+        self.on_remove = on_remove
+        self.runs = 0
+        self.totals = self._empty_report()
+        self.last_report = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._lock_file = None
+
+    def start(self, interval: float, lock_path: Optional[str] = None) -> bool:
+        """Запускает фоновую очистку. С lock_path очистку ведёт только один
+        процесс из нескольких воркеров — тот, что первым взял блокировку."""
+        if self._thread is not None:
+            return True
+        if lock_path and fcntl is not None:
+            lock_file = open(lock_path, 'a')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            # Блокировка держится, пока открыт файл, то есть до конца процесса
+            self._lock_file = lock_file
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='janitor', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Ошибка очистки проектов: {e}")
+
+    def run_once(self) -> Dict[str, Any]:
+        """Один проход очистки; возвращает отчёт о том, что удалено"""
+        with self._lock:
+            started = time.monotonic()
+            report = self._empty_report()
+
+            self._sweep_archives(report)
+            if self.max_per_user > 0:
+                self._drain(lambda: self.catalog.over_quota(self.max_per_user, self.batch_size),
+                            'quota', report)
+            if self.project_ttl > 0:
+                before = time.time() - self.project_ttl
+                self._drain(lambda: self.catalog.stale(before, self.batch_size), 'expired', report)
+
+            report["duration"] = round(time.monotonic() - started, 3)
+            self.runs += 1
+            for key in self.totals:
+                self.totals[key] += report[key]
+            self.last_report = report
+            return report
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "totals": dict(self.totals),
+            "last_run": self.last_report,
+            "max_projects_per_user": self.max_per_user,
+            "project_ttl": self.project_ttl,
+            "archive_ttl": self.archive_ttl
+        }
+
+    @staticmethod
+    def _empty_report():
+        return {
+            "archives_removed": 0,
+            "projects_removed_quota": 0,
+            "projects_removed_expired": 0,
+            "bytes_reclaimed": 0,
+            "inodes_reclaimed": 0
+        }
+
+    def _sweep_archives(self, report):
+        """Удаляет ZIP из TEMP_DIR старше archive_ttl"""
+        before = time.time() - self.archive_ttl
+        for seen, entry in enumerate(self.resolver.iter_archives(), 1):
+            if seen % self.batch_size == 0:
+                time.sleep(self.pause)
+            try:
+                stat = entry.stat()
+                if stat.st_mtime >= before:
+                    continue
+                os.remove(entry.path)
+            except OSError:
+                continue
+            report["archives_removed"] += 1
+            report["bytes_reclaimed"] += stat.st_size
+            report["inodes_reclaimed"] += 1
+
+    def _drain(self, next_batch: Callable[[], List[str]], reason: str, report):
+        while True:
+            project_ids = next_batch()
+            if not project_ids:
+                return
+            for project_id in project_ids:
+                self._remove_project(project_id, report)
+                report[f"projects_removed_{reason}"] += 1
+            time.sleep(self.pause)
+
+    def _remove_project(self, project_id, report):
+        # Из каталога убираем в любом случае, иначе проект попадёт в каждую пачку
+        self.catalog.remove(project_id)
+        if self.on_remove is not None:
+            self.on_remove(project_id)
+
+        project_path = self.resolver.find_project_dir(project_id)
+        if project_path is not None:
+            size, inodes = tree_usage(project_path)
+            shutil.rmtree(project_path, ignore_errors=True)
+            report["bytes_reclaimed"] += size
+            report["inodes_reclaimed"] += inodes
+
+        archive_path = self.resolver.find_archive(project_id)
+        if archive_path is None:
+            return
+        try:
+            size = os.path.getsize(archive_path)
+            os.remove(archive_path)
+        except OSError:
+            return
+        report["archives_removed"] += 1
+        report["bytes_reclaimed"] += size
+        report["inodes_reclaimed"] += 1
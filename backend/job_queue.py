@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+try:
+    from .metrics import REGISTRY
+except ImportError:
+    from metrics import REGISTRY
+
+JOB_WAIT = REGISTRY.histogram('job_queue_wait_seconds', 'Время задачи в очереди до начала выполнения')
+JOB_DURATION = REGISTRY.histogram('job_duration_seconds', 'Время выполнения задачи воркером', ('outcome',))
+
+
+class QueueFullError(Exception):
+    """Очередь задач переполнена"""
+
+
+class JobManager:
+    """Пул воркеров, разбирающих очередь задач генерации.
+
+    Задача — словарь со статусом (queued/generating/completed/error),
+    прогрессом и результатом. Каждое изменение статуса передаётся в notify,
+    чтобы его можно было отправить клиенту через Socket.IO.
+    """
+
+    def __init__(self, task_queue, handler, workers=4, notify=None, max_finished=1000):
+        self.queue = task_queue
+        self.handler = handler
+        self.workers = workers
+        self.notify = notify
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._started = False
+
+    def start(self):
+        """Запускает воркеры (повторный вызов ничего не делает)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f"project-worker-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, payload, sid=None):
+        """Ставит задачу в очередь и сразу возвращает её описание"""
+        self.start()
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "status": "queued",
+            "progress": 0,
+            "message": "Проект в очереди",
+            "result": None,
+            "sid": sid,
+            "created_at": time.time(),
+            "updated_at": time.time()
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+        try:
+            self.queue.put_nowait((job["job_id"], payload))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job["job_id"]]
+            raise QueueFullError("Очередь генерации переполнена")
+        self._notify(job)
+        return self.public_view(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self.public_view(job) if job is not None else None
+
+    def stats(self):
+        with self._lock:
+            active = len(self._jobs) - len(self._finished)
+        return {
+            "queued": self.queue.qsize(),
+            "active": active,
+            "finished": len(self._finished),
+            "workers": self.workers
+        }
+
+    @staticmethod
+    def public_view(job):
+        return {key: value for key, value in job.items() if key != "sid"}
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+            job["updated_at"] = time.time()
+            if job["status"] in ("completed", "error"):
+                self._finished[job["job_id"]] = True
+                while len(self._finished) > self.max_finished:
+                    old_id, _ = self._finished.popitem(last=False)
+                    self._jobs.pop(old_id, None)
+        self._notify(job)
+
+    def _notify(self, job):
+        if self.notify is None:
+            return
+        try:
+            self.notify(job)
+        except Exception as e:
+            print(f"Ошибка отправки статуса задачи {job['job_id']}: {e}")
+
+    def _worker(self):
+        while True:
+            job_id, payload = self.queue.get()
+            try:
+                with self._lock:
+                    job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                started = time.time()
+                JOB_WAIT.observe(started - job["created_at"])
+                self._update(job, status="generating", progress=10, message="Создаю проект...")
+
+                def progress(value, message):
+                    self._update(job, progress=value, message=message)
+
+                try:
+                    result = self.handler(payload, progress)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                JOB_DURATION.labels("success" if result.get("success") else "error").observe(
+                    time.time() - started
+                )
+
+                if result.get("success"):
+                    self._update(job, status="completed", progress=100,
+                                 message=result.get("message", "Проект создан успешно!"),
+                                 result=result)
+                else:
+                    self._update(job, status="error", progress=100,
+                                 message=f"Ошибка: {result.get('error', 'Неизвестная ошибка')}",
+                                 result=result)
+            finally:
+                self.queue.task_done()
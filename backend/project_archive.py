@@ -0,0 +1,153 @@
+import hashlib
+import io
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# Размер чанка, которым архив отдаётся клиенту
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Несикабельный приёмник байтов, который накапливает куски ZIP-потока"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def pending(self):
+        return self._size
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        return data
+
+
+# Фиксированное время записей: байты архива зависят только от содержимого,
+# поэтому его ETag — digest манифеста и он не меняется между сборками
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _zip_info(arcname: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def iter_zip_chunks(files: Dict[str, str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Собирает ZIP из содержимого файлов и отдаёт его кусками по мере готовности.
+
+    Архив пишется в несикабельный поток, поэтому zipfile использует
+    data descriptors и не требует временного файла на диске. Записи идут
+    по порядку путей с фиксированным временем: одинаковые файлы дают
+    одинаковые байты.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for arcname in sorted(files):
+            content = files[arcname]
+            data = content.encode('utf-8') if isinstance(content, str) else content
+            zipf.writestr(_zip_info(arcname), data)
+            if sink.pending() >= chunk_size:
+                yield sink.drain()
+    # Центральный каталог дописывается при закрытии архива
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def build_zip_bytes(files: Dict[str, str]) -> bytes:
+    """Собирает ZIP целиком в памяти"""
+    return b''.join(iter_zip_chunks(files))
+
+
+def patch_zip_bytes(archive: bytes, changed: Dict[str, bytes], removed: Iterable[str] = ()) -> bytes:
+    """Собирает новый ZIP из старого, пережимая только изменённые файлы.
+
+    Записи неизменённых файлов (локальный заголовок, сжатые данные и data
+    descriptor) копируются байт в байт: в них нет абсолютных смещений,
+    меняется только центральный каталог, который zipfile пишет заново.
+    Порядок записей и их формат те же, что у build_zip_bytes, поэтому
+    результат совпадает с полной сборкой тех же файлов.
+    """
+    skip = set(changed) | set(removed)
+    source = zipfile.ZipFile(io.BytesIO(archive))
+    infos = sorted(source.infolist(), key=lambda info: info.header_offset)
+    # Запись тянется до начала следующей записи или центрального каталога
+    ends = [info.header_offset for info in infos[1:]] + [source.start_dir]
+    kept = {
+        info.filename: (info, info.header_offset, end)
+        for info, end in zip(infos, ends) if info.filename not in skip
+    }
+
+    sink = _ChunkSink()
+    view = memoryview(archive)
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as target:
+        for arcname in sorted(set(kept) | set(changed)):
+            if arcname in changed:
+                target.writestr(_zip_info(arcname), changed[arcname])
+                continue
+            info, start, end = kept[arcname]
+            info.header_offset = target.fp.tell()
+            target.fp.write(view[start:end])
+            target.filelist.append(info)
+            target.NameToInfo[arcname] = info
+            target.start_dir = target.fp.tell()
+    return sink.drain()
+
+
+class FileDigestCache:
+    """Hash содержимого файлов на диске, пересчитываемый только при их изменении.
+
+    Ключ проверки — (mtime_ns, size) из одного os.stat, так что повторные
+    обращения к неизменённому архиву не читают его заново.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[Tuple[str, os.stat_result]]:
+        """(hash, stat) файла или None, если файла нет"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                return entry[1], stat
+
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        except OSError:
+            # Файл удалили между stat и чтением
+            return None
+        value = digest.hexdigest()
+
+        with self._lock:
+            self._entries[path] = (key, value)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value, stat
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Каталог проектов в SQLite: список без обхода PROJECTS_DIR на каждый запрос.
+
+Пересборка каталога с диска (из папки backend):
+    python project_catalog.py rebuild [--projects-dir projects] [--db project_catalog.sqlite3]
+"""
+
+import argparse
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from project_paths import PathResolver
+
+SORT_COLUMNS = ('created_at', 'updated_at', 'name')
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(value, project_id: str) -> str:
+    raw = json.dumps([value, project_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """Возвращает (значение сортировки, id) или бросает ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, project_id = json.loads(raw.decode('utf-8'))
+    except Exception:
+        raise ValueError("Некорректный cursor")
+    return value, project_id
+
+
+class ProjectCatalog:
+    """Индекс проектов: владелец, имя, время создания и размер.
+
+    Страницы отдаются по курсору (keyset pagination): запрос следующей
+    страницы стоит столько же, сколько первой, независимо от числа проектов.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS projects ("
+            "id TEXT PRIMARY KEY, name TEXT NOT NULL, owner TEXT, "
+            "project_type TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "file_count INTEGER NOT NULL DEFAULT 0, size_bytes INTEGER NOT NULL DEFAULT 0)"
+        )
+        for column in SORT_COLUMNS:
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS projects_{column} ON projects ({column}, id)"
+            )
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS projects_owner_{column} ON projects (owner, {column}, id)"
+            )
+        self._db.commit()
+
+    def add(self, project_id: str, name: str, project_type: str = None, owner: str = None,
+            file_count: int = 0, size_bytes: int = 0, created_at: float = None):
+        now = time.time() if created_at is None else created_at
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO projects "
+                "(id, name, owner, project_type, created_at, updated_at, file_count, size_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (project_id, name, owner, project_type, now, now, file_count, size_bytes)
+            )
+            self._db.commit()
+
+    def touch(self, project_id: str, file_count: int, size_bytes: int):
+        """Отмечает обновление проекта"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE projects SET updated_at = ?, file_count = ?, size_bytes = ? WHERE id = ?",
+                (time.time(), file_count, size_bytes, project_id)
+            )
+            self._db.commit()
+
+    def remove(self, project_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+            self._db.commit()
+
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def count(self, owner: str = None) -> int:
+        with self._lock:
+            if owner is None:
+                return self._db.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+            return self._db.execute(
+                "SELECT COUNT(*) FROM projects WHERE owner = ?", (owner,)
+            ).fetchone()[0]
+
+    def over_quota(self, max_per_owner: int, limit: int) -> List[str]:
+        """Самые старые проекты владельцев, у которых их больше max_per_owner"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM ("
+                "SELECT id, created_at, ROW_NUMBER() OVER ("
+                "PARTITION BY owner ORDER BY created_at DESC, id DESC) AS position "
+                "FROM projects WHERE owner IS NOT NULL) "
+                "WHERE position > ? ORDER BY created_at LIMIT ?",
+                (max_per_owner, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def stale(self, before: float, limit: int) -> List[str]:
+        """Проекты, которые не обновлялись с момента before"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM projects WHERE updated_at < ? ORDER BY updated_at LIMIT ?",
+                (before, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def list(self, owner: str = None, sort: str = 'created_at', order: str = 'desc',
+             limit: int = 50, cursor: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Возвращает (страница проектов, курсор следующей страницы или None)"""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Сортировка возможна по: {', '.join(SORT_COLUMNS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order должен быть asc или desc")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        where, params = [], []
+        if owner is not None:
+            where.append("owner = ?")
+            params.append(owner)
+        if cursor:
+            value, project_id = decode_cursor(cursor)
+            compare = '<' if order == 'desc' else '>'
+            where.append(f"({sort} {compare} ? OR ({sort} = ? AND id {compare} ?))")
+            params.extend([value, value, project_id])
+
+        query = "SELECT * FROM projects"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        direction = order.upper()
+        query += f" ORDER BY {sort} {direction}, id {direction} LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = [dict(row) for row in self._db.execute(query, params).fetchall()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][sort], rows[-1]['id'])
+        return rows, next_cursor
+
+    def rebuild(self, resolver: PathResolver) -> int:
+        """Пересобирает каталог по папкам проектов, в том числе шардированным.
+
+        Владелец, имя и тип уже известных проектов сохраняются, новые
+        получают имя по ID; проекты, которых нет на диске, удаляются.
+        """
+        found = []
+        for entry in resolver.iter_project_dirs():
+            try:
+                uuid.UUID(entry.name)
+            except ValueError:
+                continue
+            file_count, size_bytes = 0, 0
+            for root, dirs, files in os.walk(entry.path):
+                for filename in files:
+                    file_count += 1
+                    size_bytes += os.path.getsize(os.path.join(root, filename))
+            stat = entry.stat()
+            found.append((entry.name, f"Проект {entry.name[:8]}", stat.st_ctime,
+                          stat.st_mtime, file_count, size_bytes))
+
+        with self._lock:
+            self._db.execute("CREATE TEMP TABLE IF NOT EXISTS found (id TEXT PRIMARY KEY)")
+            self._db.execute("DELETE FROM found")
+            self._db.executemany("INSERT INTO found (id) VALUES (?)", [(row[0],) for row in found])
+            self._db.execute("DELETE FROM projects WHERE id NOT IN (SELECT id FROM found)")
+            self._db.executemany(
+                "INSERT INTO projects (id, name, created_at, updated_at, file_count, size_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET file_count = excluded.file_count, "
+                "size_bytes = excluded.size_bytes",
+                found
+            )
+            self._db.commit()
+        return len(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Каталог проектов Lovable AI")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    rebuild = subparsers.add_parser('rebuild', help="пересобрать каталог по папке проектов")
+    rebuild.add_argument('--projects-dir', default=os.getenv('PROJECTS_DIR', 'projects'))
+    rebuild.add_argument('--temp-dir', default=os.getenv('TEMP_DIR', 'temp'))
+    rebuild.add_argument('--depth', type=int, default=int(os.getenv('PROJECTS_SHARD_DEPTH', '2')))
+    rebuild.add_argument('--db', default=os.getenv('PROJECT_CATALOG_PATH', 'project_catalog.sqlite3'))
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    resolver = PathResolver(args.projects_dir, args.temp_dir, args.depth)
+    count = ProjectCatalog(args.db).rebuild(resolver)
+    print(f"✅ В каталоге {count} проектов ({time.monotonic() - started:.2f} с)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import posixpath
+import re
+from typing import Dict, List, Optional
+
+# Путь к файлу с расширением: index.html, src/components/App.jsx, .eslintrc.json
+_PATH = r'[\w.\-]*[\w\-](?:/[\w.\-]+)*\.[A-Za-z0-9]+'
+_PATH_RE = re.compile(_PATH)
+
+# Строка-заголовок файла: "### index.html", "**styles.css**", "2. script.js - ...",
+# "Файл: src/app.js", "`README.md`:". Имя должно стоять в начале строки,
+# поэтому простое упоминание "css" или "javascript" в тексте заголовком не считается
+_HEADER_RE = re.compile(
+    r'^\s*(?:#{1,6}\s*|[-*+]\s+|\d+[.)]\s*)*'
+    r'(?:\*\*|__)?`?'
+    r'(?:(?:файл|file|filename|path)\s*:?\s*)?'
+    r'`?(?P<path>' + _PATH + r')`?'
+    r'(?:\*\*|__)?\s*(?::|—|-|–|\(|$)',
+    re.IGNORECASE
+)
+
+_FENCE_RE = re.compile(r'^\s*(?P<fence>`{3,}|~{3,})\s*(?P<info>.*?)\s*$')
+
+# Имя по умолчанию для блока без имени — по языку из info-строки
+LANGUAGE_FILES = {
+    'html': 'index.html',
+    'css': 'styles.css',
+    'js': 'script.js',
+    'javascript': 'script.js',
+    'jsx': 'App.jsx',
+    'ts': 'script.ts',
+    'typescript': 'script.ts',
+    'json': 'package.json',
+    'md': 'README.md',
+    'markdown': 'README.md',
+    'py': 'main.py',
+    'python': 'main.py'
+}
+
+# Заголовки файлов короткие; длинные строки не проверяем регуляркой
+_MAX_HEADER_LENGTH = 160
+
+
+def safe_path(path: str) -> Optional[str]:
+    """Нормализует относительный путь; None для абсолютных путей и выхода через .."""
+    path = path.strip().strip('`"\'').replace('\\', '/')
+    if not path or path.startswith('/'):
+        return None
+    normalized = posixpath.normpath(path)
+    if normalized.startswith('../') or normalized in ('.', '..'):
+        return None
+    return normalized
+
+
+def _header_path(line: str) -> Optional[str]:
+    if len(line) > _MAX_HEADER_LENGTH:
+        return None
+    match = _HEADER_RE.match(line)
+    if match is None:
+        return None
+    return safe_path(match.group('path'))
+
+
+def _info_path(info: str) -> Optional[str]:
+    """Имя файла из info-строки: ```html index.html, ```js title="src/app.js", ```src/app.js"""
+    for token in info.replace('=', ' ').split():
+        token = token.strip('"\'')
+        if token.startswith('title') and not token[5:]:
+            continue
+        if _PATH_RE.fullmatch(token):
+            return safe_path(token)
+    return None
+
+
+def parse_project_files(response: str) -> Dict[str, str]:
+    """Извлекает файлы из ответа модели за один проход по строкам.
+
+    Понимает блоки кода в ``` и ~~~, имя файла берётся из info-строки блока,
+    из ближайшего заголовка перед блоком или по языку блока. Вложенные
+    блоки (пример ```bash внутри README) не закрывают внешний. Если в ответе
+    нет ни одного блока кода, содержимым файла считается текст под его
+    заголовком. Содержимое копится в списках строк и склеивается один раз.
+    """
+    fenced: Dict[str, List[str]] = {}
+    loose: Dict[str, List[str]] = {}
+    pending = None
+    buffer = None
+    fence = None
+    depth = 0
+
+    for line in response.splitlines():
+        if buffer is not None:
+            match = _FENCE_RE.match(line)
+            if match and match.group('fence')[0] == fence[0] and len(match.group('fence')) >= len(fence):
+                if match.group('info'):
+                    depth += 1
+                elif depth:
+                    depth -= 1
+                else:
+                    buffer = None
+                    continue
+            buffer.append(line)
+            continue
+
+        match = _FENCE_RE.match(line)
+        if match:
+            fence = match.group('fence')
+            info = match.group('info')
+            depth = 0
+            name = _info_path(info) or pending
+            if name is None:
+                language = re.sub(r'\W', '', info.split()[0].lower()) if info else ''
+                name = LANGUAGE_FILES.get(language)
+                if name is None or name in fenced:
+                    name = f"file{len(fenced) + 1}.{language or 'txt'}"
+            # Повторный блок с тем же именем заменяет предыдущий
+            buffer = fenced[name] = []
+            pending = None
+            continue
+
+        path = _header_path(line)
+        if path is not None:
+            pending = path
+            loose.setdefault(path, [])
+        elif pending is not None and not fenced:
+            loose[pending].append(line)
+
+    files = fenced if fenced else {name: lines for name, lines in loose.items() if lines}
+    return {name: '\n'.join(lines).strip('\n') + '\n' for name, lines in files.items()}
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Раскладка проектов и архивов на диске по шардам: projects/ab/cd/<uuid>.
+
+Миграция существующей плоской раскладки без остановки сервера (из папки backend):
+    python project_paths.py migrate [--batch 500] [--pause 0.05]
+
+Пока миграция идёт, проекты ищутся и по новому, и по старому пути.
+"""
+
+import argparse
+import os
+import string
+import time
+from typing import Iterator, Optional, Tuple
+
+_HEX = frozenset(string.hexdigits.lower())
+
+
+class PathResolver:
+    """Пути к папкам проектов и их архивам.
+
+    Первые depth пар символов uuid становятся вложенными папками, так что
+    в одном каталоге оказывается не больше 256 записей на уровень вместо
+    всех проектов сразу. depth=0 — старая плоская раскладка.
+    """
+
+    def __init__(self, projects_dir: str, temp_dir: str, depth: int = 2, width: int = 2):
+        self.projects_dir = projects_dir
+        self.temp_dir = temp_dir
+        self.depth = depth
+        self.width = width
+
+    def shard(self, project_id: str) -> Tuple[str, ...]:
+        return tuple(
+            project_id[level * self.width:(level + 1) * self.width]
+            for level in range(self.depth)
+        )
+
+    def project_dir(self, project_id: str) -> str:
+        """Папка нового проекта"""
+        return os.path.join(self.projects_dir, *self.shard(project_id), project_id)
+
+    def archive_path(self, project_id: str) -> str:
+        """Путь, по которому сохраняется архив проекта"""
+        return os.path.join(self.temp_dir, *self.shard(project_id), f"{project_id}.zip")
+
+    def legacy_project_dir(self, project_id: str) -> str:
+        return os.path.join(self.projects_dir, project_id)
+
+    def legacy_archive_path(self, project_id: str) -> str:
+        return os.path.join(self.temp_dir, f"{project_id}.zip")
+
+    def find_project_dir(self, project_id: str) -> Optional[str]:
+        """Существующая папка проекта в новой или старой раскладке"""
+        for path in (self.project_dir(project_id), self.legacy_project_dir(project_id)):
+            if os.path.isdir(path):
+                return path
+        return None
+
+    def find_archive(self, project_id: str) -> Optional[str]:
+        for path in (self.archive_path(project_id), self.legacy_archive_path(project_id)):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def iter_project_dirs(self) -> Iterator[os.DirEntry]:
+        """Папки всех проектов, в том числе ещё не перенесённых в шарды"""
+        for entry in self._scan(self.projects_dir):
+            if entry.is_dir():
+                yield entry
+
+    def iter_archives(self) -> Iterator[os.DirEntry]:
+        for entry in self._scan(self.temp_dir):
+            if entry.name.endswith('.zip') and entry.is_file():
+                yield entry
+
+    def _is_shard(self, name: str) -> bool:
+        return len(name) == self.width and all(char in _HEX for char in name)
+
+    def _scan(self, root):
+        """Записи верхнего уровня (старая раскладка) и листовые записи шардов"""
+        if not os.path.isdir(root):
+            return
+
+        def scan(path, level):
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if level < self.depth and self._is_shard(entry.name) and entry.is_dir():
+                        yield from scan(entry.path, level + 1)
+                    elif level == 0 or level == self.depth:
+                        yield entry
+
+        yield from scan(root, 0)
+
+
+def migrate(resolver: PathResolver, batch: int = 500, pause: float = 0.05):
+    """Переносит проекты и архивы из плоской раскладки в шарды.
+
+    os.rename внутри одной файловой системы атомарен, поэтому каждый
+    проект в любой момент доступен либо по старому, либо по новому пути.
+    """
+    report = {"projects": 0, "archives": 0, "skipped": 0}
+    moved = 0
+    for root, suffix, target, key in (
+        (resolver.projects_dir, '', resolver.project_dir, "projects"),
+        (resolver.temp_dir, '.zip', resolver.archive_path, "archives")
+    ):
+        if not os.path.isdir(root):
+            continue
+        with os.scandir(root) as entries:
+            legacy = [
+                entry for entry in entries
+                if not resolver._is_shard(entry.name) and entry.name.endswith(suffix)
+                and (entry.is_file() if suffix else entry.is_dir())
+            ]
+        for entry in legacy:
+            project_id = entry.name[:len(entry.name) - len(suffix)] if suffix else entry.name
+            destination = target(project_id)
+            if destination == entry.path or os.path.exists(destination):
+                report["skipped"] += 1
+                continue
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.rename(entry.path, destination)
+            report[key] += 1
+            moved += 1
+            if moved % batch == 0:
+                time.sleep(pause)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Раскладка проектов по шардам")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    command = subparsers.add_parser('migrate', help="перенести проекты из плоской раскладки")
+    command.add_argument('--projects-dir', default=os.getenv('PROJECTS_DIR', 'projects'))
+    command.add_argument('--temp-dir', default=os.getenv('TEMP_DIR', 'temp'))
+    command.add_argument('--depth', type=int, default=int(os.getenv('PROJECTS_SHARD_DEPTH', '2')))
+    command.add_argument('--batch', type=int, default=500)
+    command.add_argument('--pause', type=float, default=0.05)
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    report = migrate(PathResolver(args.projects_dir, args.temp_dir, args.depth), args.batch, args.pause)
+    print(f"✅ Перенесено проектов: {report['projects']}, архивов: {report['archives']}, "
+          f"пропущено: {report['skipped']} ({time.monotonic() - started:.2f} с)")
+
+
+if __name__ == '__main__':
+    main()
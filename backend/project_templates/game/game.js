@@ -0,0 +1,83 @@
+// Игра на реакцию: успей кликнуть по цели, пока она не исчезла
+const canvas = document.getElementById('game');
+const ctx = canvas.getContext('2d');
+const scoreEl = document.getElementById('score');
+const timeEl = document.getElementById('time');
+const bestEl = document.getElementById('best');
+const startButton = document.getElementById('start');
+
+const ROUND_SECONDS = 30;
+let score = 0;
+let timeLeft = ROUND_SECONDS;
+let target = null;
+let timer = null;
+let best = Number(localStorage.getItem('best-score') || 0);
+bestEl.textContent = best;
+
+function spawnTarget() {
+    const radius = 15 + Math.random() * 20;
+    target = {
+        x: radius + Math.random() * (canvas.width - radius * 2),
+        y: radius + Math.random() * (canvas.height - radius * 2),
+        radius,
+        born: performance.now()
+    };
+}
+
+function draw() {
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    if (target) {
+        const age = (performance.now() - target.born) / 1000;
+        ctx.fillStyle = `hsl(${(age * 120) % 360}, 80%, 60%)`;
+        ctx.beginPath();
+        ctx.arc(target.x, target.y, target.radius, 0, Math.PI * 2);
+        ctx.fill();
+    }
+    if (timer) {
+        requestAnimationFrame(draw);
+    }
+}
+
+function finish() {
+    clearInterval(timer);
+    timer = null;
+    target = null;
+    draw();
+    if (score > best) {
+        best = score;
+        localStorage.setItem('best-score', best);
+        bestEl.textContent = best;
+    }
+    startButton.disabled = false;
+}
+
+startButton.addEventListener('click', () => {
+    score = 0;
+    timeLeft = ROUND_SECONDS;
+    scoreEl.textContent = score;
+    timeEl.textContent = timeLeft;
+    startButton.disabled = true;
+    spawnTarget();
+    timer = setInterval(() => {
+        timeLeft -= 1;
+        timeEl.textContent = timeLeft;
+        if (timeLeft <= 0) {
+            finish();
+        }
+    }, 1000);
+    draw();
+});
+
+canvas.addEventListener('click', (event) => {
+    if (!timer || !target) return;
+    const rect = canvas.getBoundingClientRect();
+    const x = (event.clientX - rect.left) * (canvas.width / rect.width);
+    const y = (event.clientY - rect.top) * (canvas.height / rect.height);
+    if (Math.hypot(x - target.x, y - target.y) <= target.radius) {
+        // Чем быстрее клик, тем больше очков
+        const reaction = (performance.now() - target.born) / 1000;
+        score += Math.max(1, Math.round(10 - reaction * 5));
+        scoreEl.textContent = score;
+        spawnTarget();
+    }
+});
@@ -0,0 +1,13 @@
+console.log('Приложение загружено!');
+
+// Добавляем интерактивность
+document.addEventListener('DOMContentLoaded', function() {
+    const container = document.querySelector('.container');
+    
+    container.addEventListener('click', function() {
+        this.style.transform = 'scale(1.05)';
+        setTimeout(() => {
+            this.style.transform = 'scale(1)';
+        }, 200);
+    });
+});
@@ -0,0 +1,18 @@
+// Плавная прокрутка к разделам
+document.querySelectorAll('a[href^="#"]').forEach(link => {
+    link.addEventListener('click', event => {
+        const section = document.querySelector(link.getAttribute('href'));
+        if (section) {
+            event.preventDefault();
+            section.scrollIntoView({ behavior: 'smooth' });
+        }
+    });
+});
+
+// Форма заявки без сервера: просто показываем подтверждение
+document.getElementById('contact-form').addEventListener('submit', event => {
+    event.preventDefault();
+    const email = event.target.email.value;
+    document.getElementById('form-status').textContent = `Спасибо! Мы напишем на ${email}`;
+    event.target.reset();
+});
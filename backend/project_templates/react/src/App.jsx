@@ -0,0 +1,31 @@
+const PROJECT_NAME = {{ project_name|js }};
+const DESCRIPTION = {{ description|js }};
+
+function Counter() {
+    const [count, setCount] = React.useState(0);
+
+    return (
+        <div className="counter">
+            <button onClick={() => setCount(count - 1)}>−</button>
+            <span style={{ minWidth: '3rem' }}>{count}</span>
+            <button onClick={() => setCount(count + 1)}>+</button>
+        </div>
+    );
+}
+
+function App() {
+    return (
+        <div className="container">
+            <header>
+                <h1>{PROJECT_NAME}</h1>
+                <p>{DESCRIPTION}</p>
+            </header>
+            <main>
+                <Counter />
+                <p className="footer">Создано с помощью Lovable AI</p>
+            </main>
+        </div>
+    );
+}
+
+ReactDOM.createRoot(document.getElementById('root')).render(<App />);
@@ -0,0 +1,121 @@
+from typing import Dict, Iterable, List, Optional, Union
+
+# Грубая оценка для BPE-токенизаторов: латиница и код — около 4 символов
+# на токен, кириллица и прочие символы — около 2
+ASCII_CHARS_PER_TOKEN = 4
+OTHER_CHARS_PER_TOKEN = 2
+
+Files = Union[str, Dict[str, str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценивает число токенов в тексте с небольшим запасом"""
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    other_chars = len(text) - ascii_chars
+    return ascii_chars // ASCII_CHARS_PER_TOKEN + other_chars // OTHER_CHARS_PER_TOKEN + 1
+
+
+def truncate_to_tokens(text: str, tokens: int, marker: str = '\n… (обрезано)') -> str:
+    """Обрезает текст так, чтобы он вместе с пометкой уложился в tokens"""
+    if estimate_tokens(text) <= tokens:
+        return text
+    limit = max(tokens - estimate_tokens(marker), 1)
+    # Больше ASCII_CHARS_PER_TOKEN символов на токен не бывает; дальше
+    # пропорционально укорачиваем, пока оценка не уложится в лимит
+    end = min(len(text), limit * ASCII_CHARS_PER_TOKEN)
+    while end > 0 and estimate_tokens(text[:end]) > limit:
+        end = end * limit // estimate_tokens(text[:end])
+    return text[:max(end, 0)] + marker
+
+
+def format_file(name: str, content: str) -> str:
+    return f"### {name}\n```\n{content.rstrip()}\n```\n"
+
+
+def as_files(code: Files) -> Dict[str, str]:
+    """Приводит код к словарю {имя файла: содержимое}"""
+    if isinstance(code, dict):
+        return code
+    return {'code': code}
+
+
+def order_files(files: Dict[str, str], focus: Optional[Iterable[str]] = None) -> List[str]:
+    """Имена файлов по приоритету: сначала изменённые/интересующие, затем
+    остальные в исходном порядке"""
+    first = [name for name in (focus or ()) if name in files]
+    chosen = set(first)
+    return first + [name for name in files if name not in chosen]
+
+
+def split_file(name: str, content: str, limit: int) -> List[str]:
+    """Режет файл по строкам на части, каждая из которых укладывается в limit"""
+    lines = content.splitlines(keepends=True)
+    pieces, current, used = [], [], 0
+    # Запас на заголовок и ограждение блока кода
+    header = estimate_tokens(format_file(f"{name} (часть 99/99)", ''))
+    room = max(limit - header, 1)
+    for line in lines:
+        size = estimate_tokens(line)
+        if size > room:
+            line = truncate_to_tokens(line, room)
+            size = estimate_tokens(line)
+        if current and used + size > room:
+            pieces.append(''.join(current))
+            current, used = [], 0
+        current.append(line)
+        used += size
+    if current or not pieces:
+        pieces.append(''.join(current))
+    total = len(pieces)
+    if total == 1:
+        return [format_file(name, pieces[0])]
+    return [format_file(f"{name} (часть {i}/{total})", piece) for i, piece in enumerate(pieces, 1)]
+
+
+def pack_chunks(files: Dict[str, str], limit: int,
+                focus: Optional[Iterable[str]] = None) -> List[str]:
+    """Раскладывает файлы по кускам не больше limit токенов.
+
+    Файлы идут в порядке приоритета и добавляются в текущий кусок, пока он
+    не переполнится, — приоритетные файлы оказываются вместе в первом куске.
+    Слишком большой файл режется на части.
+    """
+    chunks, current, used = [], [], 0
+    for name in order_files(files, focus):
+        for block in split_file(name, files[name], limit):
+            size = estimate_tokens(block)
+            if current and used + size > limit:
+                chunks.append(''.join(current))
+                current, used = [], 0
+            current.append(block)
+            used += size
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
+def render_files(files: Dict[str, str], focus: Optional[Iterable[str]] = None) -> str:
+    """Весь проект одним текстом в порядке приоритета"""
+    if list(files) == ['code']:
+        return files['code']
+    return ''.join(format_file(name, files[name]) for name in order_files(files, focus))
+
+
+def pack_parts(parts: List[str], limit: int) -> List[List[str]]:
+    """Группирует частичные ответы для шага свёртки.
+
+    Каждый ответ обрезается до половины бюджета, поэтому в группу попадает
+    минимум два ответа и число групп на каждом шаге сокращается.
+    """
+    groups, current, used = [], [], 0
+    for part in parts:
+        part = truncate_to_tokens(part, limit // 2)
+        size = estimate_tokens(part)
+        if current and used + size > limit:
+            groups.append(current)
+            current, used = [], 0
+        current.append(part)
+        used += size
+    if current:
+        groups.append(current)
+    return groups
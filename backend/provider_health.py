@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker одного провайдера со скользящими оценками (EWMA).
+
+    После failure_threshold ошибок подряд провайдер «размыкается» и запросы
+    к нему сразу отклоняются. Через reset_timeout пропускается один пробный
+    запрос: успех замыкает цепь, ошибка снова размыкает её.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, alpha: float = 0.3):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.alpha = alpha
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.latency_ewma = None
+        self.success_ewma = 1.0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Можно ли сейчас отправить запрос провайдеру"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._observe(latency, 1.0)
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            self.probe_in_flight = False
+
+    def record_failure(self, latency: float):
+        with self._lock:
+            self._observe(latency, 0.0)
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    def release(self):
+        """Снимает флаг пробного запроса, если тот был отменён без результата"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def score(self) -> float:
+        """Ожидаемая «цена» запроса: задержка с поправкой на долю успехов"""
+        latency = self.latency_ewma if self.latency_ewma is not None else 0.0
+        return latency / max(self.success_ewma, 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+                "success_rate_ewma": round(self.success_ewma, 3),
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected
+            }
+
+    def _observe(self, latency, success):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.alpha * (latency - self.latency_ewma)
+        self.success_ewma += self.alpha * (success - self.success_ewma)
+
+
+class ProviderHealth:
+    """Состояние здоровья всех провайдеров и их адаптивный порядок"""
+
+    def __init__(self, services: List[str], **breaker_options):
+        self.breakers = {service: CircuitBreaker(**breaker_options) for service in services}
+
+    def allow(self, service: str) -> bool:
+        breaker = self.breakers.get(service)
+        return breaker is None or breaker.allow()
+
+    def record(self, service: str, success: bool, latency: float):
+        breaker = self.breakers.get(service)
+        if breaker is None:
+            return
+        if success:
+            breaker.record_success(latency)
+        else:
+            breaker.record_failure(latency)
+
+    def release(self, service: str):
+        breaker = self.breakers.get(service)
+        if breaker is not None:
+            breaker.release()
+
+    def order(self, services: List[str]) -> List[str]:
+        """Сортирует сервисы: сначала доступные, затем по задержке и успешности.
+
+        Сортировка стабильная, поэтому при равных оценках сохраняется
+        порядок из конфигурации.
+        """
+        def key(service):
+            breaker = self.breakers.get(service)
+            if breaker is None:
+                return (0, 0.0)
+            return (1 if breaker.state == OPEN else 0, breaker.score())
+        return sorted(services, key=key)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {service: breaker.snapshot() for service, breaker in self.breakers.items()}
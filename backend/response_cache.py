@@ -0,0 +1,156 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Приводит промпт к каноническому виду: NFKC и схлопнутые пробелы.
+
+    Отступы в шаблонах AIConfig.prompts и случайные пробелы пользователя
+    не должны давать разные ключи кэша.
+    """
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', prompt)).strip()
+
+
+def make_key(service: str, model: str, prompt: str, temperature: float) -> str:
+    raw = json.dumps([service, model, normalize_prompt(prompt), temperature], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Кэш ответов AI провайдеров: LRU в памяти и опционально SQLite на диске"""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600,
+                 sqlite_path: Optional[str] = None, max_disk_entries: int = 10000,
+                 busy_timeout: float = 5.0, prune_every: int = 100):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.prune_every = prune_every
+        self._memory = OrderedDict()
+        # _lock — только память; соединение SQLite под своим замком, чтобы
+        # попадания в память не ждали записи на диск
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        if sqlite_path:
+            try:
+                # timeout — busy timeout: несколько процессов пишут в один файл
+                self._db = sqlite3.connect(sqlite_path, timeout=busy_timeout, check_same_thread=False)
+                if sqlite_path != ':memory:':
+                    self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Кэш ответов на диске отключён: {e}")
+                self._db = None
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return value
+                del self._memory[key]
+
+        row = None
+        if self._db is not None:
+            # Сбой диска не должен ронять запрос: работаем как промах
+            try:
+                with self._db_lock:
+                    row = self._db.execute(
+                        "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Ошибка чтения кэша ответов: {e}")
+
+        with self._lock:
+            if row is not None and row[1] > now:
+                value = json.loads(row[0])
+                self._put_memory_locked(key, row[1], value)
+                self.counters["disk_hits"] += 1
+                return value
+            self.counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._put_memory_locked(key, expires_at, value)
+            self.counters["stores"] += 1
+        if self._db is None:
+            return
+
+        data = json.dumps(value, ensure_ascii=False)
+        with self._db_lock:
+            self._writes += 1
+            # Чистка сканирует таблицу, поэтому идёт раз в prune_every записей
+            prune = self._writes % self.prune_every == 0
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, data, expires_at, now)
+                )
+                if prune:
+                    self._prune_locked(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Ошибка записи в кэш ответов: {e}")
+                self._rollback()
+
+    def _prune_locked(self, now):
+        """Удаляет просроченные и самые старые записи сверх лимита"""
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._memory)
+            stats["max_entries"] = self.max_entries
+            stats["ttl"] = self.ttl
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Ошибка чтения кэша ответов: {e}")
+        return stats
+
+    def _put_memory_locked(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _rollback(self):
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
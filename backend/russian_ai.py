@@ -1,217 +1,501 @@
-import requests
 import json
 import time
-from typing import Dict, Any, Optional
-from .ai_config import AIConfig
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Any, Iterable, List, Optional
 
-class RussianAI:
-    def __init__(self):
-        self.config = AIConfig()
-        self.session = requests.Session()
+try:
+    from .ai_config import AIConfig
+    from .response_cache import ResponseCache, make_key, normalize_prompt
+    from .singleflight import SingleFlight
+    from .provider_health import ProviderHealth
+    from .transport import build_session, pool_stats
+    from .project_parser import parse_project_files
+    from .metrics import REGISTRY
+    from .prompt_budget import (
+        Files, as_files, estimate_tokens, pack_chunks, pack_parts, render_files
+    )
+except ImportError:
+    # Модуль импортирован из app.py, запущенного как скрипт
+    from ai_config import AIConfig
+    from response_cache import ResponseCache, make_key, normalize_prompt
+    from singleflight import SingleFlight
+    from provider_health import ProviderHealth
+    from transport import build_session, pool_stats
+    from project_parser import parse_project_files
+    from metrics import REGISTRY
+    from prompt_budget import (
+        Files, as_files, estimate_tokens, pack_chunks, pack_parts, render_files
+    )
+
+# Названия сервисов для сообщений об ошибках
+PROVIDER_TITLES = {
+    'gigachat': 'GigaChat',
+    'yandex': 'Yandex GPT',
+    'localai': 'LocalAI'
+}
+
+PROVIDER_LATENCY = REGISTRY.histogram(
+    'provider_request_duration_seconds',
+    'Время запроса к AI провайдеру',
+    ('service', 'mode', 'outcome')
+)
+PROVIDER_REJECTED = REGISTRY.counter(
+    'provider_rejected_total',
+    'Запросы, отклонённые разомкнутым circuit breaker',
+    ('service',)
+)
+
+class BaseRussianAI:
+    """Общая часть синхронного и асинхронного клиентов: конфигурация,
+    кэш ответов, здоровье провайдеров, форматы запросов и разбор ответов"""
     
-    def generate_response(self, prompt: str, ai_service: str = None) -> Dict[str, Any]:
-        """Генерирует ответ используя указанный AI сервис"""
-        if not ai_service:
-            ai_service = self.config.default_ai
-        
-        if ai_service == 'gigachat':
-            return self._gigachat_request(prompt)
-        elif ai_service == 'yandex':
-            return self._yandex_request(prompt)
-        elif ai_service == 'localai':
-            return self._localai_request(prompt)
-        else:
-            return self._fallback_response(prompt)
+    def __init__(self, config: AIConfig = None):
+        self.config = config or AIConfig()
+        self.cache = None
+        if self.config.cache_enabled:
+            self.cache = ResponseCache(
+                max_entries=self.config.cache_max_entries,
+                ttl=self.config.cache_ttl,
+                sqlite_path=self.config.cache_sqlite_path or None,
+                max_disk_entries=self.config.cache_max_disk_entries
+            )
+        self.health = ProviderHealth(
+            list(self.config.models),
+            failure_threshold=self.config.breaker_failure_threshold,
+            reset_timeout=self.config.breaker_reset_timeout
+        )
     
-    def _gigachat_request(self, prompt: str) -> Dict[str, Any]:
-        """Запрос к GigaChat API"""
-        if not self.config.gigachat_enabled:
-            return self._error_response("GigaChat не настроен")
-        
-        try:
-            headers = {
-                'Authorization': f'Bearer {self.config.gigachat_api_key}',
-                'Content-Type': 'application/json'
+    def share_state(self, other: 'BaseRussianAI'):
+        """Использует кэш и состояние провайдеров другого клиента"""
+        self.cache = other.cache
+        self.health = other.health
+    
+    def _allow(self, ai_service: str) -> bool:
+        """Пропускает ли circuit breaker запрос к сервису"""
+        if self.health.allow(ai_service):
+            return True
+        PROVIDER_REJECTED.labels(ai_service).inc()
+        return False
+    
+    def _record_call(self, ai_service: str, success: bool, latency: float, mode: str = 'request'):
+        """Учитывает результат запроса в здоровье провайдера и метриках"""
+        self.health.record(ai_service, success, latency)
+        PROVIDER_LATENCY.labels(ai_service, mode, 'success' if success else 'error').observe(latency)
+    
+    def _cache_lookup(self, prompt: str, ai_service: str):
+        """Возвращает (ключ кэша, закэшированный ответ или None)"""
+        # Кэшируются только успешные ответы настоящих провайдеров
+        if self.cache is None or ai_service not in self.config.models:
+            return None, None
+        cache_key = make_key(
+            ai_service, self.config.models[ai_service], prompt, self.config.temperature
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cache_key, {**cached, 'cached': True}
+        return cache_key, None
+    
+    def _build_request(self, ai_service: str, prompt: str, stream: bool = False):
+        """Возвращает (url, headers, data) запроса к сервису"""
+        headers = {'Content-Type': 'application/json'}
+        if ai_service == 'yandex':
+            headers['Authorization'] = f'Api-Key {self.config.yandex_api_key}'
+            data = {
+                'modelUri': self.config.models['yandex'],
+                'completionText': prompt,
+                'maxTokens': self.config.response_tokens
             }
-            
+        else:
+            # GigaChat и LocalAI используют OpenAI-совместимый формат
+            if ai_service == 'gigachat':
+                headers['Authorization'] = f'Bearer {self.config.gigachat_api_key}'
             data = {
-                'model': 'GigaChat:latest',
+                'model': self.config.models[ai_service],
                 'messages': [{'role': 'user', 'content': prompt}],
-                'temperature': 0.7,
-                'max_tokens': 2000
+                'temperature': self.config.temperature,
+                'max_tokens': self.config.response_tokens
             }
-            
-            response = self.session.post(
-                'https://gigachat.devices.sberbank.ru/api/v1/chat/completions',
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    'success': True,
-                    'response': result['choices'][0]['message']['content'],
-                    'ai_service': 'gigachat'
-                }
-            else:
-                return self._error_response(f"GigaChat ошибка: {response.status_code}")
-                
-        except Exception as e:
-            return self._error_response(f"GigaChat ошибка: {str(e)}")
+            if stream:
+                data['stream'] = True
+                headers['Accept'] = 'text/event-stream'
+        return self.config.endpoints[ai_service], headers, data
     
-    def _yandex_request(self, prompt: str) -> Dict[str, Any]:
-        """Запрос к Yandex GPT API"""
-        if not self.config.yandex_enabled:
-            return self._error_response("Yandex GPT не настроен")
+    def _success_response(self, ai_service: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Извлекает текст из JSON ответа сервиса"""
+        if ai_service == 'yandex':
+            text = result['result']['alternatives'][0]['text']
+        else:
+            text = result['choices'][0]['message']['content']
+        return {
+            'success': True,
+            'response': text,
+            'ai_service': ai_service
+        }
+    
+    @staticmethod
+    def _parse_sse_line(line: bytes) -> Optional[str]:
+        """Возвращает фрагмент текста из строки SSE, '' для служебных строк
+        и None для завершающего [DONE]"""
+        # SSE: полезные строки начинаются с "data:"
+        if not line.startswith(b'data:'):
+            return ''
+        payload = line[5:].strip()
+        if payload == b'[DONE]':
+            return None
+        chunk = json.loads(payload.decode('utf-8'))
+        choices = chunk.get('choices') or [{}]
+        return choices[0].get('delta', {}).get('content') or ''
+    
+    def _fallback_response(self, prompt: str) -> Dict[str, Any]:
+        """Fallback ответ когда AI сервисы недоступны"""
+        return {
+            'success': True,
+            'response': f"Извините, AI сервисы временно недоступны. Ваш запрос: {prompt}",
+            'ai_service': 'fallback'
+        }
+    
+    def _error_response(self, error_message: str) -> Dict[str, Any]:
+        """Возвращает ошибку"""
+        return {
+            'success': False,
+            'error': error_message,
+            'ai_service': 'error'
+        }
+    
+    def available_services(self) -> List[str]:
+        """Настроенные сервисы в порядке наблюдаемой скорости и надёжности"""
+        return self.health.order(self.config.get_available_ais())
+    
+    def context_budget(self, ai_service: str) -> int:
+        """Сколько токенов промпта помещается в контекст сервиса"""
+        context = self.config.context_tokens.get(ai_service, min(self.config.context_tokens.values()))
+        return context - self.config.response_tokens
+    
+    def _plan_code_prompts(self, template_name: str, code: Files,
+                           focus: Optional[Iterable[str]], services: List[str]):
+        """Возвращает (промпты, сервисы) для задачи над кодом проекта.
+        
+        Если проект целиком помещается в контекст хотя бы одного сервиса,
+        это один промпт только для таких сервисов. Иначе код раскладывается
+        на куски под самый маленький контекст, чтобы части мог взять любой
+        сервис, а результаты потом сворачиваются через _merge_prompts.
+        """
+        template = self.config.prompts[template_name]
+        files = as_files(code)
+        whole = template.format(code=render_files(files, focus))
+        if not services:
+            return [whole], services
         
+        size = estimate_tokens(whole)
+        fitting = [service for service in services if size <= self.context_budget(service)]
+        if fitting:
+            return [whole], fitting
+        
+        limit = self._prompt_room(services, estimate_tokens(template.format(code='')))
+        return [template.format(code=chunk) for chunk in pack_chunks(files, limit, focus)], services
+    
+    def _merge_prompts(self, template_name: str, parts: List[str], services: List[str]) -> List[str]:
+        """Промпты шага свёртки: частичные ответы, сгруппированные по бюджету"""
+        task = self.config.prompts[template_name].format(code='(код обработан по частям)')
+        merge = self.config.prompts['merge_results']
+        limit = self._prompt_room(services, estimate_tokens(merge.format(task=task, parts='')))
+        labeled = [f"--- Часть {i} ---\n{part}" for i, part in enumerate(parts, 1)]
+        return [
+            merge.format(task=task, parts='\n\n'.join(group))
+            for group in pack_parts(labeled, limit)
+        ]
+    
+    def _prompt_room(self, services: List[str], overhead: int) -> int:
+        # Не меньше пары сотен токенов, даже если контекст настроен слишком малым
+        return max(min(self.context_budget(service) for service in services) - overhead, 256)
+    
+    def _parse_project_response(self, response: str, project_type: str) -> Dict[str, Any]:
+        """Парсит ответ AI и извлекает файлы проекта"""
         try:
-            headers = {
-                'Authorization': f'Api-Key {self.config.yandex_api_key}',
-                'Content-Type': 'application/json'
-            }
+            files = parse_project_files(response)
+            if project_type == 'html':
+                # Стандартный набор файлов HTML проекта присутствует всегда
+                for name in ('index.html', 'styles.css', 'script.js', 'README.md'):
+                    files.setdefault(name, '')
             
-            data = {
-                'modelUri': 'gpt://b1g8c7fqomqkqkqkqkqk/yandexgpt-lite',
-                'completionText': prompt,
-                'maxTokens': 2000
+            return {
+                'success': True,
+                'files': files,
+                'project_type': project_type
             }
             
+        except Exception as e:
+            return self._error_response(f"Ошибка парсинга проекта: {str(e)}")
+
+class RussianAI(BaseRussianAI):
+    def __init__(self, config: AIConfig = None):
+        super().__init__(config)
+        # Общая сессия с настроенными пулами соединений для каждого провайдера
+        self.session = build_session(self.config)
+        # Пул для параллельного опроса провайдеров
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.race_workers, thread_name_prefix='ai-race'
+        )
+        self.flights = SingleFlight()
+    
+    def generate_response(self, prompt: str, ai_service: str = None,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Генерирует ответ используя указанный AI сервис.
+        
+        timeout ограничивает таймаут провайдера сверху — остаток общего
+        дедлайна first_success.
+        """
+        if not ai_service:
+            ai_service = self.config.default_ai
+        
+        cache_key, cached = self._cache_lookup(prompt, ai_service)
+        if cached is not None:
+            return cached
+        
+        # Одинаковые одновременные запросы делят один вызов провайдера
+        result, collapsed = self.flights.do(
+            (ai_service, normalize_prompt(prompt)),
+            lambda: self._call_provider(prompt, ai_service, cache_key, timeout)
+        )
+        return {**result, 'coalesced': True} if collapsed else result
+    
+    def _call_provider(self, prompt: str, ai_service: str, cache_key: Optional[str],
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Запрос к сервису с учётом circuit breaker и записью в кэш"""
+        # Ненастроенные сервисы отвечают мгновенно и не влияют на здоровье
+        tracked = self.config.is_ai_available(ai_service)
+        if tracked and not self._allow(ai_service):
+            return self._error_response(f"{ai_service} временно недоступен")
+        
+        started = time.monotonic()
+        result = self._request(prompt, ai_service, timeout)
+        if tracked:
+            self._record_call(ai_service, result['success'], time.monotonic() - started)
+        
+        if cache_key is not None and result['success']:
+            self.cache.set(cache_key, result)
+        return result
+    
+    def _request(self, prompt: str, ai_service: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Отправляет запрос выбранному сервису"""
+        if ai_service not in PROVIDER_TITLES:
+            return self._fallback_response(prompt)
+        
+        title = PROVIDER_TITLES[ai_service]
+        if not self.config.is_ai_available(ai_service):
+            return self._error_response(f"{title} не настроен")
+        
+        try:
+            url, headers, data = self._build_request(ai_service, prompt)
             response = self.session.post(
-                'https://llm.api.cloud.yandex.net/foundationModels/v1/completion',
+                url,
                 headers=headers,
                 json=data,
-                timeout=30
+                timeout=min(self.config.provider_timeouts[ai_service], timeout or float('inf'))
             )
             
             if response.status_code == 200:
-                result = response.json()
-                return {
-                    'success': True,
-                    'response': result['result']['alternatives'][0]['text'],
-                    'ai_service': 'yandex'
-                }
+                return self._success_response(ai_service, response.json())
             else:
-                return self._error_response(f"Yandex GPT ошибка: {response.status_code}")
+                return self._error_response(f"{title} ошибка: {response.status_code}")
                 
         except Exception as e:
-            return self._error_response(f"Yandex GPT ошибка: {str(e)}")
+            return self._error_response(f"{title} ошибка: {str(e)}")
     
-    def _localai_request(self, prompt: str) -> Dict[str, Any]:
-        """Запрос к LocalAI"""
-        if not self.config.localai_enabled:
-            return self._error_response("LocalAI не настроен")
+    def stream_response(self, prompt: str, on_delta: Callable[[str], None],
+                        ai_service: str = None) -> Dict[str, Any]:
+        """Генерирует ответ потоком: каждый фрагмент текста передаётся в on_delta.
         
-        try:
-            headers = {'Content-Type': 'application/json'}
-            
-            data = {
-                'model': 'gpt-3.5-turbo',
-                'messages': [{'role': 'user', 'content': prompt}],
-                'temperature': 0.7,
-                'max_tokens': 2000
-            }
+        GigaChat и LocalAI отдают OpenAI-совместимый SSE поток. Для сервисов
+        без потоковой выдачи ответ передаётся в on_delta одним фрагментом.
+        """
+        if not ai_service:
+            ai_service = self.config.default_ai
+        
+        if ai_service in ('gigachat', 'localai'):
+            if not self.config.is_ai_available(ai_service):
+                return self._error_response(f"{ai_service} не настроен")
+            if not self._allow(ai_service):
+                return self._error_response(f"{ai_service} временно недоступен")
             
+            started = time.monotonic()
+            result = self._stream_chat_completions(prompt, on_delta, ai_service)
+            self._record_call(ai_service, result['success'], time.monotonic() - started, 'stream')
+            return result
+        
+        result = self.generate_response(prompt, ai_service)
+        if result['success']:
+            on_delta(result['response'])
+        return result
+    
+    def _stream_chat_completions(self, prompt: str, on_delta: Callable[[str], None],
+                                 ai_service: str) -> Dict[str, Any]:
+        """Читает SSE поток OpenAI-совместимого /chat/completions"""
+        title = PROVIDER_TITLES[ai_service]
+        try:
+            url, headers, data = self._build_request(ai_service, prompt, stream=True)
             response = self.session.post(
-                f'{self.config.localai_url}/v1/chat/completions',
+                url,
                 headers=headers,
                 json=data,
-                timeout=30
+                timeout=self.config.provider_timeouts[ai_service],
+                stream=True
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    'success': True,
-                    'response': result['choices'][0]['message']['content'],
-                    'ai_service': 'localai'
-                }
-            else:
-                return self._error_response(f"LocalAI ошибка: {response.status_code}")
+            with response:
+                if response.status_code != 200:
+                    return self._error_response(f"{title} ошибка: {response.status_code}")
+                
+                parts = []
+                for line in response.iter_lines():
+                    delta = self._parse_sse_line(line)
+                    if delta is None:
+                        break
+                    if delta:
+                        parts.append(delta)
+                        on_delta(delta)
+            
+            return {
+                'success': True,
+                'response': ''.join(parts),
+                'ai_service': ai_service
+            }
                 
         except Exception as e:
-            return self._error_response(f"LocalAI ошибка: {str(e)}")
+            return self._error_response(f"{title} ошибка: {str(e)}")
     
-    def _fallback_response(self, prompt: str) -> Dict[str, Any]:
-        """Fallback ответ когда AI сервисы недоступны"""
-        return {
-            'success': True,
-            'response': f"Извините, AI сервисы временно недоступны. Ваш запрос: {prompt}",
-            'ai_service': 'fallback'
-        }
+    def transport_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика пулов соединений к провайдерам"""
+        return pool_stats(self.session)
     
-    def _error_response(self, error_message: str) -> Dict[str, Any]:
-        """Возвращает ошибку"""
-        return {
-            'success': False,
-            'error': error_message,
-            'ai_service': 'error'
-        }
+    def first_success(self, prompt: str, services: List[str]) -> Optional[Dict[str, Any]]:
+        """Возвращает первый успешный ответ из списка сервисов или None.
+        
+        В обоих режимах опрос укладывается в global_deadline: таймаут
+        каждого запроса не больше остатка дедлайна.
+        """
+        if self.config.race_mode == 'sequential' or len(services) <= 1:
+            deadline = time.monotonic() + self.config.global_deadline
+            for ai_service in services:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                result = self.generate_response(prompt, ai_service, remaining)
+                if result['success']:
+                    return result
+            return None
+        return self._race(prompt, services)
+    
+    def _race(self, prompt: str, services: List[str]) -> Optional[Dict[str, Any]]:
+        """Hedged-опрос: следующий сервис стартует через hedge_delay или сразу
+        после ошибки предыдущего, побеждает первый успешный ответ.
+        
+        Запросы, которые уже выполняются, прервать нельзя — их результат
+        просто отбрасывается; ещё не начатые отменяются. Таймаут каждого
+        запроса ограничен остатком дедлайна, поэтому проигравшие занимают
+        поток self.executor не дольше global_deadline.
+        """
+        deadline = time.monotonic() + self.config.global_deadline
+        pending = list(services)
+        futures = {}
+        next_launch = time.monotonic()
+        
+        try:
+            while pending or futures:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                
+                if pending and (not futures or now >= next_launch):
+                    ai_service = pending.pop(0)
+                    future = self.executor.submit(
+                        self.generate_response, prompt, ai_service, deadline - now
+                    )
+                    futures[future] = ai_service
+                    next_launch = now + self.config.hedge_delay
+                    continue
+                
+                timeout = deadline - now
+                if pending:
+                    timeout = min(timeout, max(next_launch - now, 0))
+                done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    futures.pop(future)
+                    result = future.result()
+                    if result['success']:
+                        return result
+                    # Сервис ответил ошибкой — не ждём hedge_delay
+                    next_launch = time.monotonic()
+            return None
+        finally:
+            for future in futures:
+                future.cancel()
     
     def generate_project(self, description: str, project_type: str = 'html') -> Dict[str, Any]:
         """Генерирует проект на основе описания"""
         prompt = self.config.prompts['project_generation'].format(description=description)
         
         # Пробуем разные AI сервисы
-        available_ais = self.config.get_available_ais()
+        available_ais = self.available_services()
         
-        for ai_service in available_ais:
-            result = self.generate_response(prompt, ai_service)
-            if result['success']:
-                return self._parse_project_response(result['response'], project_type)
+        result = self.first_success(prompt, available_ais)
+        if result:
+            return self._parse_project_response(result['response'], project_type)
         
         return self._error_response("Не удалось сгенерировать проект")
     
-    def improve_project(self, code: str) -> Dict[str, Any]:
-        """Улучшает существующий проект"""
-        prompt = self.config.prompts['project_improvement'].format(code=code)
+    def improve_project(self, code: Files, focus: Iterable[str] = None) -> Dict[str, Any]:
+        """Улучшает существующий проект.
         
-        available_ais = self.config.get_available_ais()
-        
-        for ai_service in available_ais:
-            result = self.generate_response(prompt, ai_service)
-            if result['success']:
-                return {
-                    'success': True,
-                    'improved_code': result['response'],
-                    'ai_service': ai_service
-                }
+        code — текст или словарь {имя файла: содержимое}; файлы из focus
+        (изменённые или важные) идут в промпт первыми.
+        """
+        result, chunks = self._run_code_task('project_improvement', code, focus)
+        if result:
+            return {
+                'success': True,
+                'improved_code': result['response'],
+                'ai_service': result['ai_service'],
+                'chunks': chunks
+            }
         
         return self._error_response("Не удалось улучшить проект")
     
-    def _parse_project_response(self, response: str, project_type: str) -> Dict[str, Any]:
-        """Парсит ответ AI и извлекает код проекта"""
-        try:
-            # Простая логика извлечения кода из ответа
-            files = {
-                'index.html': '',
-                'styles.css': '',
-                'script.js': '',
-                'README.md': ''
-            }
-            
-            # Разделяем ответ на файлы (упрощенная логика)
-            lines = response.split('\n')
-            current_file = None
-            
-            for line in lines:
-                if 'index.html' in line.lower():
-                    current_file = 'index.html'
-                elif 'styles.css' in line.lower() or 'css' in line.lower():
-                    current_file = 'styles.css'
-                elif 'script.js' in line.lower() or 'javascript' in line.lower():
-                    current_file = 'script.js'
-                elif 'readme' in line.lower():
-                    current_file = 'README.md'
-                elif current_file:
-                    files[current_file] += line + '\n'
-            
+    def review_code(self, code: Files, focus: Iterable[str] = None) -> Dict[str, Any]:
+        """Код-ревью проекта"""
+        result, chunks = self._run_code_task('code_review', code, focus)
+        if result:
             return {
                 'success': True,
-                'files': files,
-                'project_type': project_type
+                'review': result['response'],
+                'ai_service': result['ai_service'],
+                'chunks': chunks
             }
-            
-        except Exception as e:
-            return self._error_response(f"Ошибка парсинга проекта: {str(e)}")
+        
+        return self._error_response("Не удалось провести код-ревью")
+    
+    def _run_code_task(self, template_name: str, code: Files, focus: Optional[Iterable[str]]):
+        """Map-reduce по частям кода; возвращает (итоговый ответ или None, число частей)"""
+        prompts, services = self._plan_code_prompts(
+            template_name, code, focus, self.available_services()
+        )
+        # Части обрабатываются по очереди: first_success сам занимает
+        # self.executor, и вложенная отправка туда могла бы его исчерпать
+        results = []
+        for prompt in prompts:
+            result = self.first_success(prompt, services)
+            if result is None:
+                return None, len(prompts)
+            results.append(result)
+        
+        while len(results) > 1:
+            parts = [result['response'] for result in results]
+            results = []
+            for prompt in self._merge_prompts(template_name, parts, services):
+                result = self.first_success(prompt, services)
+                if result is None:
+                    return None, len(prompts)
+                results.append(result)
+        return results[0], len(prompts)
+    
@@ -0,0 +1,59 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class SessionStore:
+    """Хранилище состояний агента по session id.
+
+    Сессии упорядочены по времени последнего обращения, поэтому
+    просроченные всегда лежат в начале и вытесняются за O(1) на сессию.
+    """
+
+    def __init__(self, factory, ttl=1800, max_sessions=10000):
+        self.factory = factory
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def get(self, session_id=None):
+        """Возвращает (session_id, состояние), создавая сессию при необходимости"""
+        now = time.monotonic()
+        if not session_id:
+            session_id = str(uuid.uuid4())
+        with self._lock:
+            self._evict_expired_locked(now)
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self.factory()
+                self._sessions[session_id] = state
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            state.last_seen = now
+        return session_id, state
+
+    def drop(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def snapshot(self):
+        """Список текущих состояний (для статистики)"""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict_expired_locked(self, now):
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.last_seen < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted += 1
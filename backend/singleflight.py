@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Схлопывает одновременные одинаковые вызовы в один.
+
+    Первый вызов с ключом выполняет функцию, остальные ждут и получают
+    тот же результат. После завершения ключ забывается — это не кэш.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.counters = {"leaders": 0, "collapsed": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]):
+        """Возвращает (результат, был ли вызов схлопнут)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.counters["collapsed"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.counters["leaders"] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.counters, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """То же для корутин одного event loop.
+
+    Вызов выполняется отдельной задачей, поэтому отмена одного из ждущих
+    не обрывает общий запрос для остальных. Когда отменён последний
+    ждущий, общая задача отменяется тоже — например, проигравший в гонке
+    запрос к провайдеру не доживает до конца.
+    """
+
+    def __init__(self):
+        # ключ -> [задача, число ждущих]
+        self._tasks = {}
+        self.counters = {"leaders": 0, "collapsed": 0, "cancelled": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]):
+        entry = self._tasks.get(key)
+        collapsed = entry is not None and not entry[0].done()
+        if collapsed:
+            self.counters["collapsed"] += 1
+        else:
+            self.counters["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            entry = [task, 0]
+            self._tasks[key] = entry
+            task.add_done_callback(lambda done: self._forget(key, done))
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task), collapsed
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not task.done():
+                self.counters["cancelled"] += 1
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _forget(self, key, task):
+        entry = self._tasks.get(key)
+        if entry is not None and entry[0] is task:
+            del self._tasks[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "in_flight": len(self._tasks)}
+
+
+class KeyedLock:
+    """Блокировка на ключ: вызовы с одним ключом идут по очереди, с разными — параллельно.
+
+    Замок живёт, пока его держат или ждут, поэтому словарь не растёт
+    с числом ключей.
+    """
+
+    def __init__(self):
+        # ключ -> [замок, число держащих и ждущих]
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key: Hashable):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locks)
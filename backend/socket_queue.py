@@ -0,0 +1,79 @@
+import queue
+import threading
+from typing import Any, Dict, List
+
+import socketio
+
+
+class InProcessManager(socketio.PubSubManager):
+    """Брокер Socket.IO внутри одного процесса.
+
+    Замена Redis для тестов и локального запуска: несколько серверов
+    SocketIO в одном процессе обмениваются событиями через общий канал
+    так же, как воркеры через настоящую очередь сообщений.
+    """
+    name = 'memory'
+    _channels: Dict[str, List[queue.Queue]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, url='memory://', channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.inbox = queue.Queue()
+        if not write_only:
+            with self._lock:
+                self._channels.setdefault(channel, []).append(self.inbox)
+
+    def _publish(self, data):
+        # Сообщение получает и сам отправитель: PubSubManager сам отбрасывает
+        # собственные сообщения по host_id там, где уже обработал их локально
+        with self._lock:
+            subscribers = list(self._channels.get(self.channel, ()))
+        for inbox in subscribers:
+            inbox.put(data)
+
+    def _listen(self):
+        while True:
+            yield self.inbox.get()
+
+
+def queue_options(url: str, channel: str = 'socketio') -> Dict[str, Any]:
+    """Параметры SocketIO для очереди сообщений между воркерами.
+
+    memory:// — брокер внутри процесса, redis://, amqp:// и т.д. передаются
+    Flask-SocketIO как message_queue. Пустая строка — без очереди.
+    """
+    if not url:
+        return {}
+    if url.startswith('memory://'):
+        return {'client_manager': InProcessManager(url, channel=channel)}
+    return {'message_queue': url, 'channel': channel}
+
+
+class Emitter:
+    """Отправляет события Socket.IO из отдельного потока по очереди.
+
+    С очередью сообщений socketio.emit — синхронная публикация в брокер.
+    Вызванная прямо в event loop, она останавливает все потоковые ответы
+    разом, поэтому loop только кладёт событие в очередь. Один поток
+    сохраняет порядок событий, например дельт одного ответа.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='socketio-emitter', daemon=True)
+        self._thread.start()
+
+    def emit(self, event: str, data: Any, **kwargs):
+        self._queue.put((event, data, kwargs))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            event, data, kwargs = self._queue.get()
+            try:
+                self.server.emit(event, data, **kwargs)
+            except Exception as e:
+                print(f"Ошибка отправки события {event}: {e}")
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Раздача фронтенда (index.html, script.js, styles.css) из backend.
+
+При старте файлы минифицируются, ссылки index.html заменяются на
+имена с отпечатком содержимого (styles.3f2a9c1b0d.css), а gzip и brotli
+варианты сжимаются один раз и хранятся в памяти. Ассеты с отпечатком
+отдаются с Cache-Control: immutable, index.html — с no-cache и ETag, так что
+повторная загрузка обходится ответами 304.
+
+Сборка тех же файлов на диск, например для nginx (из папки backend):
+    python static_assets.py build --out ../dist
+"""
+
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него отдаются gzip и исходные файлы
+    brotli = None
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+# Меньшие файлы не сжимаем: заголовки gzip съедают выигрыш
+MIN_COMPRESS_SIZE = 256
+
+_LOCAL_REFERENCE = re.compile(r'((?:href|src)=")([^"#?:]+)(")')
+_HTML_COMMENT = re.compile(r'<!--(?!\[).*?-->', re.S)
+_HTML_PRESERVE = re.compile(r'(<(pre|textarea)\b.*?</\2>)', re.S | re.I)
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.S)
+_CSS_SPACE = re.compile(r'\s*([{};,>])\s*|(:)\s+|\s+')
+
+# После этих символов и слов "/" начинает регулярное выражение, а не деление
+_REGEX_AFTER_CHARS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_AFTER_WORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                      'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+
+def minify_html(text: str) -> str:
+    """Убирает комментарии и отступы строк; <pre> и <textarea> не трогает"""
+    parts = _HTML_PRESERVE.split(text)
+    result = []
+    # split с двумя группами: [текст, блок, имя тега, текст, ...]
+    for index in range(0, len(parts), 3):
+        chunk = _HTML_COMMENT.sub('', parts[index])
+        lines = (line.strip() for line in chunk.split('\n'))
+        result.append('\n'.join(line for line in lines if line))
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return ''.join(result)
+
+
+def minify_css(text: str) -> str:
+    """Убирает комментарии и лишние пробелы вне строк"""
+    result = []
+    for index, token in enumerate(_CSS_TOKENS.split(text)):
+        if index % 2:
+            if not token.startswith('/*'):
+                result.append(token)
+            continue
+        result.append(_CSS_SPACE.sub(
+            lambda m: m.group(1) or m.group(2) or ' ', token
+        ))
+    return ''.join(result).replace(';}', '}').strip()
+
+
+def minify_js(text: str) -> str:
+    """Убирает комментарии, отступы и пустые строки.
+
+    Переводы строк сохраняются, поэтому автоматическая расстановка точек
+    с запятой работает как в исходнике; строки, шаблонные строки и
+    регулярные выражения копируются без изменений.
+    """
+    out = []
+    length = len(text)
+    index = 0
+    # Стек вложенности: для каждого открытого ${ внутри шаблонной строки —
+    # глубина фигурных скобок, на которой шаблон продолжается
+    templates = []
+    depth = 0
+    last = ''
+    last_word = ''
+
+    def emit_space(has_newline):
+        if not out or out[-1] in ('\n', ' '):
+            if has_newline and out and out[-1] == ' ':
+                out[-1] = '\n'
+            return
+        out.append('\n' if has_newline else ' ')
+
+    def read_template(start):
+        """Копирует шаблонную строку до конца или до ${; возвращает позицию"""
+        position = start
+        while position < length:
+            char = text[position]
+            if char == '\\':
+                position += 2
+                continue
+            if char == '`':
+                out.append(text[start:position + 1])
+                return position + 1, False
+            if char == '$' and text.startswith('${', position):
+                out.append(text[start:position + 2])
+                return position + 2, True
+            position += 1
+        out.append(text[start:])
+        return length, False
+
+    while index < length:
+        char = text[index]
+
+        if char in ' \t\r\n':
+            end = index
+            while end < length and text[end] in ' \t\r\n':
+                end += 1
+            emit_space('\n' in text[index:end])
+            index = end
+            continue
+
+        if char == '/' and text.startswith('//', index):
+            end = text.find('\n', index)
+            index = length if end == -1 else end
+            continue
+
+        if char == '/' and text.startswith('/*', index):
+            end = text.find('*/', index + 2)
+            end = length if end == -1 else end + 2
+            emit_space('\n' in text[index:end])
+            index = end
+            continue
+
+        if char in ('"', "'"):
+            position = index + 1
+            while position < length and text[position] != char:
+                position += 2 if text[position] == '\\' else 1
+            out.append(text[index:position + 1])
+            index = position + 1
+            last, last_word = char, ''
+            continue
+
+        if char == '`':
+            out.append('`')
+            index, opened = read_template(index + 1)
+            if opened:
+                templates.append(depth)
+                depth += 1
+                last, last_word = '{', ''
+            else:
+                last, last_word = '`', ''
+            continue
+
+        if char == '/' and (last in _REGEX_AFTER_CHARS or last == '' or last_word in _REGEX_AFTER_WORDS):
+            position = index + 1
+            in_class = False
+            while position < length and text[position] != '\n':
+                current = text[position]
+                if current == '\\':
+                    position += 2
+                    continue
+                if current == '[':
+                    in_class = True
+                elif current == ']':
+                    in_class = False
+                elif current == '/' and not in_class:
+                    break
+                position += 1
+            position += 1
+            while position < length and (text[position].isalnum() or text[position] == '_'):
+                position += 1
+            out.append(text[index:position])
+            index = position
+            last, last_word = '/', ''
+            continue
+
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if templates and depth == templates[-1]:
+                templates.pop()
+                if out and out[-1] == ' ':
+                    out.pop()
+                out.append('}')
+                index, opened = read_template(index + 1)
+                if opened:
+                    templates.append(depth)
+                    depth += 1
+                    last, last_word = '{', ''
+                else:
+                    last, last_word = '`', ''
+                continue
+
+        if char.isalnum() or char in '_$':
+            end = index
+            while end < length and (text[end].isalnum() or text[end] in '_$'):
+                end += 1
+            word = text[index:end]
+            # Пробел между словами обязателен, между словом и знаком — нет
+            out.append(word)
+            index = end
+            last, last_word = 'a', word
+            continue
+
+        # Пробел перед знаком не нужен, если это не перевод строки и не
+        # граница вида "a - -b", где без пробела получится "--"
+        if out and out[-1] == ' ' and not (char in '+-' and len(out) > 1 and out[-2].endswith(char)):
+            out.pop()
+        out.append(char)
+        index += 1
+        last, last_word = char, ''
+        # Пробел после знака тоже не нужен
+        end = index
+        while end < length and text[end] in ' \t':
+            end += 1
+        if end > index and char in '+-' and end < length and text[end] == char:
+            out.append(' ')
+        index = end
+
+    return ''.join(out).strip()
+
+
+MINIFIERS = {'.html': minify_html, '.css': minify_css, '.js': minify_js}
+
+
+def fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def fingerprinted_name(name: str, digest: str) -> str:
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{digest}{extension}"
+
+
+def accepted_encodings(header: Optional[str]) -> Tuple[str, ...]:
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0"""
+    encodings = []
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if name and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.append(name.lower())
+    return tuple(encodings)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Слабое сравнение для If-None-Match (RFC 9110, 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class StaticAsset:
+    """Файл фронтенда в памяти с заранее сжатыми вариантами"""
+    __slots__ = ('name', 'content_type', 'cache_control', 'digest', 'variants')
+
+    def __init__(self, name: str, data: bytes, cache_control: str):
+        self.name = name
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.digest = fingerprint(data)
+        # кодировка -> (тело, ETag); у каждого варианта свой сильный ETag
+        self.variants: Dict[str, Tuple[bytes, str]] = {'identity': (data, f'"{self.digest}"')}
+        if len(data) >= MIN_COMPRESS_SIZE:
+            self._add_variant('gzip', gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._add_variant('br', brotli.compress(data, quality=11))
+
+    def _add_variant(self, encoding, body):
+        if len(body) < len(self.variants['identity'][0]):
+            suffix = 'gz' if encoding == 'gzip' else encoding
+            self.variants[encoding] = (body, f'"{self.digest}-{suffix}"')
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[str, bytes, str]:
+        """(кодировка, тело, ETag) лучшего варианта для Accept-Encoding"""
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and (encoding in accepted or '*' in accepted):
+                return (encoding, *self.variants[encoding])
+        return ('identity', *self.variants['identity'])
+
+    def respond(self, accept_encoding: Optional[str], if_none_match: Optional[str]):
+        """(статус, тело, заголовки) ответа на GET"""
+        encoding, body, etag = self.select(accept_encoding)
+        headers = {
+            'ETag': etag,
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        if etag_matches(if_none_match, etag):
+            return 304, b'', headers
+        headers['Content-Type'] = self.content_type
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return 200, body, headers
+
+
+class StaticAssets:
+    """Фронтенд из directory: entry и все локальные файлы, на которые он ссылается"""
+
+    def __init__(self, directory: str, entry: str = 'index.html', minify: bool = True):
+        self.directory = directory
+        self.entry_name = entry
+        self.minify = minify
+        self.assets: Dict[str, StaticAsset] = {}
+        # исходное имя -> имя с отпечатком
+        self.fingerprints: Dict[str, str] = {}
+        self.entry = self._build()
+
+    def _read(self, name: str) -> bytes:
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            data = f.read()
+        minifier = MINIFIERS.get(os.path.splitext(name)[1]) if self.minify else None
+        if minifier is None:
+            return data
+        return minifier(data.decode('utf-8')).encode('utf-8')
+
+    def _build(self) -> StaticAsset:
+        with open(os.path.join(self.directory, self.entry_name), encoding='utf-8') as f:
+            html = f.read()
+
+        for name in self.references(html):
+            data = self._read(name)
+            hashed = fingerprinted_name(name, fingerprint(data))
+            self.fingerprints[name] = hashed
+            self.assets[hashed] = StaticAsset(hashed, data, IMMUTABLE)
+            # Старое имя без отпечатка тоже отвечает, но перепроверяется
+            self.assets[name] = StaticAsset(name, data, REVALIDATE)
+
+        html = _LOCAL_REFERENCE.sub(
+            lambda m: m.group(1) + self.fingerprints.get(m.group(2), m.group(2)) + m.group(3), html
+        )
+        entry_data = minify_html(html).encode('utf-8') if self.minify else html.encode('utf-8')
+        entry = StaticAsset(self.entry_name, entry_data, REVALIDATE)
+        self.assets[self.entry_name] = entry
+        return entry
+
+    def references(self, html: str) -> Iterable[str]:
+        """Локальные файлы из href/src, которые есть в каталоге"""
+        seen = []
+        for match in _LOCAL_REFERENCE.finditer(html):
+            name = match.group(2)
+            if name in seen or name.startswith('/') or '..' in name:
+                continue
+            if os.path.isfile(os.path.join(self.directory, name)):
+                seen.append(name)
+        return seen
+
+    def get(self, name: str) -> Optional[StaticAsset]:
+        return self.assets.get(name)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Размеры файлов по вариантам сжатия"""
+        return {
+            name: {encoding: len(body) for encoding, (body, _) in asset.variants.items()}
+            for name, asset in self.assets.items()
+        }
+
+    def write(self, out_dir: str):
+        """Пишет файлы с отпечатками и их .gz/.br рядом, для раздачи nginx"""
+        os.makedirs(out_dir, exist_ok=True)
+        for name, asset in self.assets.items():
+            if name in self.fingerprints:
+                continue
+            for encoding, (body, _) in asset.variants.items():
+                suffix = {'identity': '', 'gzip': '.gz', 'br': '.br'}[encoding]
+                path = os.path.join(out_dir, name + suffix)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сборка фронтенда")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    command = subparsers.add_parser('build', help="минифицировать, добавить отпечатки и сжать")
+    command.add_argument('--src', default=os.getenv('FRONTEND_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+    command.add_argument('--out', default='dist')
+    command.add_argument('--no-minify', action='store_true')
+    args = parser.parse_args()
+
+    assets = StaticAssets(args.src, minify=not args.no_minify)
+    assets.write(args.out)
+    for name, sizes in assets.stats().items():
+        if name in assets.fingerprints:
+            continue
+        variants = ', '.join(f"{encoding} {size}" for encoding, size in sizes.items())
+        print(f"✅ {name}: {variants}")
+
+
+if __name__ == '__main__':
+    main()
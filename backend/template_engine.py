@@ -0,0 +1,123 @@
+import html
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+# {{ name }} или {{ name|filter }}. Только идентификатор внутри скобок,
+# поэтому JSX вида style={{ color: 'red' }} подстановкой не считается
+_PLACEHOLDER = re.compile(r'\{\{\s*([A-Za-z_]\w*)\s*(?:\|\s*([A-Za-z_]\w*)\s*)?\}\}')
+
+FILTERS = {
+    'raw': str,
+    'html': lambda value: html.escape(str(value)),
+    'js': lambda value: json.dumps(str(value), ensure_ascii=False)
+}
+
+Render = Callable[[Dict[str, str]], str]
+
+
+class TemplateError(Exception):
+    pass
+
+
+def compile_template(source: str, name: str = '<template>') -> Render:
+    """Компилирует шаблон в функцию render(context) -> str.
+
+    Статические куски и вызовы фильтров собираются в одно выражение
+    ''.join((...)), которое компилируется один раз; шаблон без
+    подстановок возвращает заранее готовую строку.
+    """
+    parts: List[str] = []
+    namespace = {}
+    position = 0
+    for index, match in enumerate(_PLACEHOLDER.finditer(source)):
+        static = source[position:match.start()]
+        if static:
+            namespace[f"s{index}"] = static
+            parts.append(f"s{index}")
+        variable, filter_name = match.group(1), match.group(2) or 'raw'
+        if filter_name not in FILTERS:
+            raise TemplateError(f"{name}: неизвестный фильтр {filter_name}")
+        namespace[f"f_{filter_name}"] = FILTERS[filter_name]
+        parts.append(f"f_{filter_name}(context[{variable!r}])")
+        position = match.end()
+
+    if not parts:
+        return lambda context: source
+
+    tail = source[position:]
+    if tail:
+        namespace["tail"] = tail
+        parts.append("tail")
+    code = compile(f"def render(context):\n    return ''.join(({', '.join(parts)},))\n", name, 'exec')
+    exec(code, namespace)
+    return namespace['render']
+
+
+class ProjectTemplate:
+    """Набор скомпилированных файлов одного типа проекта"""
+
+    def __init__(self, project_type: str, files: Dict[str, Render]):
+        self.project_type = project_type
+        self.files = files
+
+    def render(self, context: Dict[str, str], paths: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        if paths is None:
+            return {path: render(context) for path, render in self.files.items()}
+        return {path: self.files[path](context) for path in paths if path in self.files}
+
+
+class TemplateRegistry:
+    """Шаблоны проектов из каталога: <directory>/<тип проекта>/<файлы>.
+
+    При старте читается только список типов; файлы типа читаются и
+    компилируются при первом рендере и дальше берутся из памяти, так что
+    ни старт, ни рендер не зависят от числа типов. preload() компилирует
+    всё сразу.
+    """
+
+    def __init__(self, directory: str, default: str = 'html'):
+        self.directory = directory
+        self.default = default
+        self._lock = threading.Lock()
+        self._compiled: Dict[str, ProjectTemplate] = {}
+        with os.scandir(directory) as entries:
+            self.types = sorted(entry.name for entry in entries if entry.is_dir())
+        if default not in self.types:
+            raise TemplateError(f"Нет шаблона по умолчанию {default} в {directory}")
+
+    def get(self, project_type: str) -> ProjectTemplate:
+        """Шаблон типа проекта; неизвестный тип заменяется шаблоном по умолчанию"""
+        template = self._compiled.get(project_type)
+        if template is not None:
+            return template
+        if project_type not in self.types:
+            return self.get(self.default)
+        with self._lock:
+            template = self._compiled.get(project_type)
+            if template is None:
+                template = self._load(project_type)
+                self._compiled[project_type] = template
+            return template
+
+    def preload(self):
+        for project_type in self.types:
+            self.get(project_type)
+
+    def render(self, project_type: str, context: Dict[str, str],
+               paths: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        return self.get(project_type).render(context, paths)
+
+    def _load(self, project_type: str) -> ProjectTemplate:
+        root = os.path.join(self.directory, project_type)
+        files = {}
+        for current, dirs, filenames in os.walk(root):
+            dirs.sort()
+            for filename in sorted(filenames):
+                full_path = os.path.join(current, filename)
+                path = os.path.relpath(full_path, root).replace(os.sep, '/')
+                with open(full_path, encoding='utf-8') as f:
+                    files[path] = compile_template(f.read(), f"{project_type}/{path}")
+        return ProjectTemplate(project_type, files)
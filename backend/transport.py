@@ -0,0 +1,87 @@
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def make_retry(retries: int, backoff: float, jitter: float, backoff_max: float = 2.0) -> Retry:
+    """Ограниченные повторы с экспоненциальной задержкой.
+
+    Повторяются только ошибки соединения и ответы 429/503 — провайдер
+    отказал до генерации. 502/504 от шлюза могут прийти, когда ответ уже
+    сгенерирован, а запрос, оборвавшийся при чтении, тоже не повторяется,
+    чтобы не платить за генерацию дважды. Retry-After не учитывается:
+    пауза не длиннее backoff_max, дольше ждать — дело circuit breaker.
+    """
+    options = dict(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        status_forcelist=(429, 503),
+        allowed_methods=frozenset({'GET', 'POST'}),
+        backoff_factor=backoff,
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    try:
+        return Retry(backoff_jitter=jitter, backoff_max=backoff_max, **options)
+    except TypeError:
+        # urllib3 < 2 не поддерживает джиттер, потолок задержки — атрибут класса
+        capped = type('CappedRetry', (Retry,), {
+            'DEFAULT_BACKOFF_MAX': backoff_max, 'BACKOFF_MAX': backoff_max
+        })
+        return capped(**options)
+
+
+def base_url(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def build_session(config) -> requests.Session:
+    """Создаёт сессию с отдельным пулом соединений для каждого провайдера"""
+    session = requests.Session()
+    session.headers['Connection'] = 'keep-alive'
+    retry = make_retry(
+        config.http_retries, config.http_backoff, config.http_backoff_jitter, config.http_backoff_max
+    )
+
+    for service, endpoint in config.endpoints.items():
+        pool_size = config.pool_sizes[service]
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+            pool_block=config.pool_block
+        )
+        session.mount(base_url(endpoint), adapter)
+    return session
+
+
+def pool_stats(session: requests.Session) -> Dict[str, Dict[str, Any]]:
+    """Статистика пулов: сколько соединений открыто и сколько запросов их переиспользовали"""
+    stats = {}
+    for prefix, adapter in session.adapters.items():
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+        manager = adapter.poolmanager
+        if manager is None:
+            continue
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            entry = stats.setdefault(host, {
+                "pool_maxsize": adapter._pool_maxsize,
+                "connections_opened": 0,
+                "requests": 0
+            })
+            entry["connections_opened"] += pool.num_connections
+            entry["requests"] += pool.num_requests
+    for entry in stats.values():
+        entry["connections_reused"] = max(entry["requests"] - entry["connections_opened"], 0)
+    return stats
@@ -0,0 +1,13 @@
+"""
+Точка входа для продакшена: gunicorn с одним воркером gthread.
+
+Запуск из папки backend:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Несколько экземпляров за балансировщиком — с разными PORT и общей
+SOCKETIO_MESSAGE_QUEUE, настройки — в gunicorn.conf.py.
+"""
+
+from app import app, socketio
+
+__all__ = ['app', 'socketio']
@@ -8,6 +8,11 @@ const WS_URL = 'ws://127.0.0.1:5002';
 // Глобальные переменные
 let isTyping = false;
 let socket = null;
+let chatSessionId = null;
+let providerStreaming = false;
+const streamingMessages = {};
+// Последние известные файлы проектов, обновляемые событием project_diff
+const projectFiles = {};
 
 // Инициализация при загрузке страницы
 document.addEventListener('DOMContentLoaded', function() {
@@ -337,6 +342,7 @@ window.initializeWebSocket = function() {
         socket.on('connect', function() {
             console.log('🔌 WebSocket подключен!');
             showConnectionStatus('Подключено', 'success');
+            checkProviderStreaming();
         });
         
         socket.on('disconnect', function() {
@@ -355,6 +361,37 @@ window.initializeWebSocket = function() {
             handleProjectStatus(data);
         });
         
+        // При обновлении проекта приходят только изменённые файлы
+        socket.on('project_diff', function(data) {
+            const files = projectFiles[data.project_id] || (projectFiles[data.project_id] = {});
+            Object.assign(files, data.files);
+            data.removed.forEach(path => delete files[path]);
+            console.log(`📝 Проект ${data.project_id}: изменено ${data.added.length + data.modified.length}, удалено ${data.removed.length}`);
+        });
+        
+        // Потоковые ответы AI провайдеров
+        socket.on('ai_stream_start', function(data) {
+            hideTypingIndicator();
+            streamingMessages[data.stream_id] = addMessage('', 'ai');
+        });
+        
+        socket.on('ai_stream_delta', function(data) {
+            const textElement = streamingMessages[data.stream_id];
+            if (textElement) {
+                textElement.textContent += data.delta;
+                const chatMessages = document.getElementById('chatMessages');
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            }
+        });
+        
+        socket.on('ai_stream_end', function(data) {
+            const textElement = streamingMessages[data.stream_id];
+            if (textElement && !data.success) {
+                textElement.textContent = 'Извините, произошла ошибка. Попробуйте еще раз.';
+            }
+            delete streamingMessages[data.stream_id];
+        });
+        
     } catch (error) {
         console.error('Ошибка подключения к WebSocket:', error);
         showConnectionStatus('Ошибка подключения', 'error');
@@ -362,6 +399,18 @@ window.initializeWebSocket = function() {
     }
 };
 
+// Проверяем, можно ли получать ответы AI провайдеров потоком
+function checkProviderStreaming() {
+    fetch(`${API_BASE_URL}/api/ai/status`)
+        .then(response => response.json())
+        .then(data => {
+            providerStreaming = Boolean(data.streaming_available);
+        })
+        .catch(() => {
+            providerStreaming = false;
+        });
+}
+
 // Показать статус подключения
 function showConnectionStatus(message, type) {
     const statusDiv = document.createElement('div');
@@ -396,7 +445,7 @@ function handleProjectStatus(data) {
     
     if (status === 'completed') {
         showNotification('✅ Проект создан успешно!', 'success');
-        showDownloadButton(download_url, project_id);
+        showDownloadButton(new URL(download_url, API_BASE_URL).href, project_id);
     } else if (status === 'error') {
         showNotification('❌ Ошибка создания проекта', 'error');
     } else if (status === 'generating') {
@@ -404,6 +453,28 @@ function handleProjectStatus(data) {
     }
 }
 
+// Опрос статуса задачи генерации, если WebSocket недоступен
+function pollJobStatus(jobId, attempt = 0) {
+    if (attempt > 120) return;
+    
+    fetch(`${API_BASE_URL}/api/jobs/${jobId}`)
+        .then(response => response.json())
+        .then(job => {
+            if (job.status === 'completed') {
+                handleProjectStatus({
+                    status: 'completed',
+                    project_id: job.result.project_id,
+                    download_url: job.result.download_url
+                });
+            } else if (job.status === 'error') {
+                handleProjectStatus({ status: 'error', message: job.message });
+            } else {
+                setTimeout(() => pollJobStatus(jobId, attempt + 1), 1000);
+            }
+        })
+        .catch(error => console.error('Ошибка получения статуса задачи:', error));
+}
+
 // Показать кнопку скачивания
 function showDownloadButton(downloadUrl, projectId) {
     const downloadDiv = document.createElement('div');
@@ -524,17 +595,32 @@ async function sendMessage() {
     // Показываем индикатор печати
     showTypingIndicator();
     
+    // Ответ провайдера приходит по фрагментам через WebSocket
+    if (providerStreaming && socket && socket.connected) {
+        socket.emit('ai_stream', { message: message });
+        return;
+    }
+    
     try {
         const response = await fetch(`${API_BASE_URL}/api/chat`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ message: message })
+            body: JSON.stringify({
+                message: message,
+                session_id: chatSessionId,
+                socket_id: socket && socket.connected ? socket.id : null
+            })
         });
         
         const data = await response.json();
         
+        // Запоминаем сессию, чтобы агент помнил контекст разговора
+        if (data.session_id) {
+            chatSessionId = data.session_id;
+        }
+        
         // Скрываем индикатор печати
         hideTypingIndicator();
         
@@ -546,6 +632,11 @@ async function sendMessage() {
             showSuggestions(data.suggestions);
         }
         
+        // Без WebSocket узнаём о готовности проекта опросом статуса задачи
+        if (data.type === 'project_queued' && !(socket && socket.connected)) {
+            pollJobStatus(data.job_id);
+        }
+        
     } catch (error) {
         console.error('Ошибка отправки сообщения:', error);
         hideTypingIndicator();
@@ -587,6 +678,8 @@ function addMessage(text, sender, data = null) {
     
     chatMessages.appendChild(messageDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    
+    return messageDiv.querySelector('.message-content p');
 }
 
 // Показать индикатор печати
@@ -51,27 +51,24 @@ def start_backend():
         print("❌ Папка backend не найдена")
         return
     
-    # Запускаем Flask приложение
+    # Запускаем Flask приложение (--production: gunicorn с воркером gthread)
+    if "--production" in sys.argv:
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"]
+    else:
+        command = [sys.executable, "app.py"]
     try:
-        subprocess.run([sys.executable, "app.py"], check=True)
+        subprocess.run(command, check=True)
     except subprocess.CalledProcessError as e:
         print(f"❌ Ошибка запуска backend: {e}")
     except FileNotFoundError:
         print("❌ Файл app.py не найден в backend директории")
 
-def start_frontend():
-    """Запускает frontend сервер"""
-    print("🌐 Запускаю frontend...")
-    os.chdir(Path.cwd().parent)  # Возвращаемся в корневую директорию
-    
-    # Запускаем HTTP сервер
-    subprocess.run([sys.executable, "-m", "http.server", "8000"])
-
 def open_browser():
     """Открывает браузер"""
     time.sleep(3)  # Ждем запуска серверов
     print("🌐 Открываю браузер...")
-    webbrowser.open("http://localhost:8000")
+    # Фронтенд раздаёт backend: сжатые ассеты с кэшированием по ETag
+    webbrowser.open("http://localhost:5002")
 
 def main():
     """Основная функция"""
@@ -88,28 +85,23 @@ def main():
     
     print("\n🎯 Все готово к запуску!")
     print("📍 Backend: http://localhost:5002")
-    print("🌐 Frontend: http://localhost:8000")
+    print("🌐 Frontend: http://localhost:5002")
     print("🔌 WebSocket: ws://localhost:5002")
     print("\n💡 Для остановки нажмите Ctrl+C")
     print("=" * 50)
     
-    # Запускаем серверы в отдельных потоках
+    # Запускаем сервер в отдельном потоке
     backend_thread = threading.Thread(target=start_backend, daemon=True)
-    frontend_thread = threading.Thread(target=start_frontend, daemon=True)
     browser_thread = threading.Thread(target=open_browser, daemon=True)
     
     try:
         backend_thread.start()
         time.sleep(2)  # Ждем запуска backend
         
-        frontend_thread.start()
-        time.sleep(1)  # Ждем запуска frontend
-        
         browser_thread.start()
         
         # Ждем завершения
         backend_thread.join()
-        frontend_thread.join()
         
     except KeyboardInterrupt:
         print("\n👋 Останавливаю серверы...")